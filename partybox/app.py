@@ -1,6 +1,7 @@
 # partybox/app.py
 from __future__ import annotations
 
+import atexit
 import os
 import re
 import json
@@ -13,6 +14,7 @@ import base64
 import socket
 import subprocess
 import shutil
+import threading
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -753,6 +755,7 @@ def _build_admin_health() -> Tuple[int, Dict[str, Any]]:
 def create_app() -> Flask:
     app = Flask(__name__, static_folder="../static", template_folder="../templates")
     spotify_client = SpotifyClient.from_env()
+    atexit.register(spotify_client.close)
     audio_mode_mgr = AudioModeManager()
 
     DB.init_db()
@@ -783,8 +786,8 @@ def create_app() -> Flask:
         except Exception as e:
             print(f"[partybox] media auto-scan FAILED: {e}")
 
-    TOP_METRIC_MODES = ("partybox", "spotify")
-    EXTERNAL_META_MODES = ("airplay", "bluetooth")
+    TOP_METRIC_MODES = METRICS.TOP_ITEM_MODES
+    EXTERNAL_META_MODES = METRICS.EXTERNAL_META_MODES
     top_cache_ttl = max(5.0, float(os.getenv("PARTYBOX_TOP_CACHE_TTL_SECONDS", "30") or "30"))
     top_cache: Dict[str, Dict[str, Any]] = {m: {"ts": 0.0, "items": []} for m in TOP_METRIC_MODES}
     media_probe = MediaMetadataProbe()
@@ -1370,9 +1373,8 @@ def create_app() -> Flask:
         if not spotify_client.enabled:
             return {"ok": False, "error": "spotify_not_configured"}
 
-        token = str(getattr(spotify_client, "_access_token", "") or "")
-        expires_at = float(getattr(spotify_client, "_access_token_expires_at", 0.0) or 0.0)
-        if not token or time.time() >= expires_at:
+        token = spotify_client.cached_access_token()
+        if not token:
             return {"ok": False, "error": "spotify_token_unavailable"}
 
         req = urllib.request.Request(
@@ -1391,6 +1393,50 @@ def create_app() -> Flask:
         except Exception as e:
             return {"ok": False, "error": str(e)}
 
+    # Long-poll support for tv_player.py: every mutating request bumps the
+    # version and wakes waiters, which then recompute and compare ETags.
+    tv_state_cond = threading.Condition()
+    tv_state_version: Dict[str, int] = {"value": 0}
+
+    def _bump_tv_state_version() -> None:
+        with tv_state_cond:
+            tv_state_version["value"] += 1
+            tv_state_cond.notify_all()
+
+    def _tv_state_payload() -> Dict[str, Any]:
+        """
+        The subset of /api/state the TV agent acts on. Leaves out Spotify and
+        external snapshots, whose timestamps would change the ETag every poll.
+        """
+        media_mode = _current_media_mode()
+        paused = _bool_setting("tv_paused", "0")
+        now = DB.get_now_playing()
+        up = DB.peek_next()
+
+        def _pack(qrow: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "queue_id": int(qrow["id"]),
+                "title": qrow["title"],
+                "youtube_id": qrow["youtube_id"],
+            }
+
+        if paused:
+            mode = "paused"
+            cur = now or up
+        elif now:
+            mode, cur = "playing", now
+        elif up:
+            mode, cur = "queue", up
+        else:
+            mode, cur = "empty", None
+        return {
+            "paused": paused,
+            "av_mode": "spotify" if media_mode == "spotify" else "partybox",
+            "media_mode": media_mode,
+            "mode": mode,
+            "now": _pack(cur) if cur else None,
+        }
+
     # Re-apply persisted mode on service startup for deterministic reboot behavior.
     try:
         startup_mode = _current_media_mode()
@@ -1417,6 +1463,8 @@ def create_app() -> Flask:
         route = str(getattr(g, "_partybox_route", _route_label()))
         duration = max(0.0, time.perf_counter() - started)
         METRICS.observe_http_request(request.method, route, int(response.status_code), duration)
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            _bump_tv_state_version()
         return response
 
     @app.teardown_request
@@ -1687,6 +1735,85 @@ def create_app() -> Flask:
             row["device_user"] = actor or "Unknown"
         return jsonify({"ok": True, "items": rows, "limit": limit, "ts": int(time.time())})
 
+    def _tv_state_response() -> Response:
+        """
+        Compact TV state with an ETag. With If-None-Match and ?wait=N (max 25s)
+        the request is held until the state changes, instead of answering 304
+        straight away, so the agent does not have to poll every second.
+        """
+        try:
+            wait = max(0.0, min(25.0, float(request.args.get("wait", "0") or 0)))
+        except ValueError:
+            wait = 0.0
+        deadline = time.monotonic() + wait
+        while True:
+            with tv_state_cond:
+                seen = tv_state_version["value"]
+            resp = jsonify(_tv_state_payload())
+            resp.add_etag()
+            resp.headers["Cache-Control"] = "no-cache"
+            # Compared by hand: make_conditional only honours GET/HEAD, and
+            # /api/tv/poll is a POST.
+            etag, _ = resp.get_etag()
+            unchanged = request.if_none_match.contains(etag)
+            remaining = deadline - time.monotonic()
+            if not unchanged:
+                return resp
+            if remaining <= 0:
+                return Response(status=304, headers={"ETag": resp.headers["ETag"], "Cache-Control": "no-cache"})
+            # Changes made outside a request (startup, background threads) are
+            # caught by re-checking at least every 2s.
+            with tv_state_cond:
+                tv_state_cond.wait_for(lambda: tv_state_version["value"] != seen, timeout=min(remaining, 2.0))
+
+    def _record_tv_heartbeat(data: Dict[str, Any]) -> None:
+        mode = str(data.get("mode") or "")
+        title = str(data.get("title") or "")
+        youtube_id = str(data.get("youtube_id") or "")
+
+        payload = {
+            "ts": int(time.time()),
+            "mode": mode[:40],
+            "title": title[:200],
+            "youtube_id": youtube_id[:200],
+            "remote_addr": request.remote_addr,
+        }
+
+        # Reuse settings table if you have it (k/v text)
+        # If your db helper is different, change these 2 lines only.
+        DB.set_setting("tv_heartbeat_json", json.dumps(payload))
+        METRICS.set_tv_ok(True)
+
+    def _record_piggybacked_heartbeat(data: Dict[str, Any]) -> None:
+        """mark_playing/mark_done may carry the agent's heartbeat (any body with "mode")."""
+        if "mode" not in data:
+            return
+        try:
+            _record_tv_heartbeat(data)
+        except Exception:
+            METRICS.inc_tv_error("heartbeat")
+            METRICS.set_tv_ok(False)
+            _record_last_error()
+
+    @app.get("/api/tv/state")
+    def api_tv_state():
+        """Compact state for tv_player.py (see _tv_state_response)."""
+        return _tv_state_response()
+
+    @app.post("/api/tv/poll")
+    def api_tv_poll():
+        """
+        Heartbeat + state in one round-trip: records the posted heartbeat,
+        then answers exactly like GET /api/tv/state (including ?wait=).
+        """
+        try:
+            _record_tv_heartbeat(request.get_json(force=True, silent=True) or {})
+        except Exception:
+            METRICS.inc_tv_error("heartbeat")
+            METRICS.set_tv_ok(False)
+            _record_last_error()
+        return _tv_state_response()
+
     @app.post("/api/tv/heartbeat")
     def api_tv_heartbeat():
         """
@@ -1694,23 +1821,7 @@ def create_app() -> Flask:
         Stores last seen + basic info for admin UI.
         """
         try:
-            data = request.get_json(force=True, silent=True) or {}
-            mode = str(data.get("mode") or "")
-            title = str(data.get("title") or "")
-            youtube_id = str(data.get("youtube_id") or "")
-
-            payload = {
-                "ts": int(time.time()),
-                "mode": mode[:40],
-                "title": title[:200],
-                "youtube_id": youtube_id[:200],
-                "remote_addr": request.remote_addr,
-            }
-
-            # Reuse settings table if you have it (k/v text)
-            # If your db helper is different, change these 2 lines only.
-            DB.set_setting("tv_heartbeat_json", json.dumps(payload))
-            METRICS.set_tv_ok(True)
+            _record_tv_heartbeat(request.get_json(force=True, silent=True) or {})
             return jsonify({"ok": True})
         except Exception as e:
             METRICS.inc_tv_error("heartbeat")
@@ -1727,6 +1838,7 @@ def create_app() -> Flask:
             _record_last_error()
             return jsonify({"ok": False, "error": "bad queue_id"}), 400
         DB.mark_playing(qid)
+        _record_piggybacked_heartbeat(data)
         METRICS.inc_tv_command("mark_playing")
         METRICS.inc_queue_play()
         try:
@@ -1746,6 +1858,7 @@ def create_app() -> Flask:
             METRICS.inc_tv_error("bad_queue_id")
             return jsonify({"ok": False, "error": "bad queue_id"}), 400
         DB.mark_done(qid)
+        _record_piggybacked_heartbeat(data)
         METRICS.inc_tv_command("mark_done")
         _update_queue_depth_metric()
         return jsonify({"ok": True})
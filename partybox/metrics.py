@@ -1,52 +1,146 @@
 from __future__ import annotations
 
+import functools
 import os
-import re
+import threading
 import time
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Tuple
 
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
 
 MEDIA_MODES = ("partybox", "spotify", "airplay", "bluetooth", "tv", "mute")
 EXTERNAL_META_MODES = ("airplay", "bluetooth")
 TOP_ITEM_MODES = ("partybox", "spotify")
 TOP_ITEM_LIMIT_DEFAULT = 25
+TOP_ITEM_LIMIT_MAX = 50
+SPOTIFY_ENDPOINT_LABEL_MAX = 64
+OTHER_LABEL = "__other__"
 START_TIME = time.time()
-_TOP_PREVIOUS_LABELS: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
-
-
+START_MONOTONIC = time.monotonic()
+
+# HTTP methods are a closed set and statuses cluster on a few dozen codes, so
+# the common cases resolve with a dict lookup instead of label cleaning.
+_METHOD_FAST = {
+    m: m.lower() for m in ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS")
+}
+_STATUS_FAST = {
+    code: str(code)
+    for code in (
+        100, 101,
+        200, 201, 202, 204, 206,
+        301, 302, 303, 304, 307, 308,
+        400, 401, 403, 404, 405, 408, 409, 410, 413, 415, 422, 429,
+        500, 501, 502, 503, 504,
+    )
+}
+# Byte table mapping every character outside [a-z0-9_./:-] to "_". Non-ASCII
+# characters are encoded as "?" first, so they map to "_" as well.
+_LABEL_ALLOWED = frozenset(b"abcdefghijklmnopqrstuvwxyz0123456789_./:-")
+_LABEL_XLATE = bytes(c if c in _LABEL_ALLOWED else ord("_") for c in range(256))
+_CRLF_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+
+@functools.lru_cache(maxsize=2048)
 def _clean_label(value: str, fallback: str = "unknown", max_len: int = 64) -> str:
     raw = (value or "").strip().lower()
     if not raw:
         return fallback
-    out = re.sub(r"[^a-z0-9_./:-]+", "_", raw)
-    out = re.sub(r"_+", "_", out).strip("_")
+    mapped = raw.encode("ascii", "replace").translate(_LABEL_XLATE)
+    # Splitting on "_" and dropping empty parts collapses runs and strips the ends.
+    out = b"_".join(part for part in mapped.split(b"_") if part).decode("ascii")
     return out[:max_len] or fallback
 
 
 def _clean_text(value: str, max_len: int = 160) -> str:
-    txt = (value or "").replace("\n", " ").replace("\r", " ").strip()
+    txt = (value or "").translate(_CRLF_TABLE).strip()
     return txt[:max_len]
 
 
+def _nn_float(value: object) -> float:
+    try:
+        v = float(value or 0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0.0
+    return v if v > 0.0 else 0.0
+
+
+def _nn_int(value: object) -> int:
+    try:
+        v = int(value or 0)  # type: ignore[call-overload]
+    except (TypeError, ValueError):
+        return 0
+    return v if v > 0 else 0
+
+
 def _normalize_route(route: str) -> str:
     if not route:
         return "unknown"
+    # _clean_label's lru_cache already memoizes route rules.
     return _clean_label(route, fallback="unknown", max_len=80)
 
 
 def _normalize_method(method: str) -> str:
+    out = _METHOD_FAST.get(method.upper() if method else "")
+    if out is not None:
+        return out
     return _clean_label(method, fallback="get", max_len=12)
 
 
 def _normalize_status(status: int | str) -> str:
+    if type(status) is int:
+        return _STATUS_FAST.get(status) or str(status)
+    if isinstance(status, str) and len(status) == 3 and status.isascii() and status.isdigit() and status[0] != "0":
+        return status
     try:
         return str(int(status))
     except Exception:
         return "0"
 
 
-def _normalize_spotify_endpoint(endpoint: str) -> str:
+class _LabelCache:
+    """
+    Bounded LRU of raw value -> normalized label.
+    With max_values set, distinct labels past the cap fold into OTHER_LABEL so
+    a misbehaving caller cannot grow a label's cardinality without bound.
+    """
+
+    def __init__(self, label: str, normalize: Callable[[str], str], max_entries: int = 1024, max_values: int = 0) -> None:
+        self._label = label
+        self._normalize = normalize
+        self._max_entries = max_entries
+        self._max_values = max_values
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._values: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, raw: str) -> str:
+        with self._lock:
+            out = self._entries.get(raw)
+            if out is not None:
+                self._entries.move_to_end(raw)
+                return out
+
+        out = self._normalize(raw)
+        capped = False
+        with self._lock:
+            if self._max_values and out not in self._values:
+                if len(self._values) >= self._max_values:
+                    out = OTHER_LABEL
+                    capped = True
+                else:
+                    self._values.add(out)
+            self._entries[raw] = out
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        if capped:
+            partybox_metrics_cardinality_capped_total.labels(self._label).inc()
+        return out
+
+
+def _spotify_endpoint_label(endpoint: str) -> str:
     path = (endpoint or "").strip()
     if not path:
         return "unknown"
@@ -59,13 +153,18 @@ def _rank_label(rank: int) -> str:
     return f"{max(1, int(rank)):02d}"
 
 
-def _track_id_label(track_id: str) -> str:
+def _clean_track_id(track_id: str) -> str:
     val = (track_id or "").strip()
     if not val:
         return "(none)"
     return _clean_label(val, fallback="(none)", max_len=96)
 
 
+_normalize_spotify_endpoint = _LabelCache("endpoint", _spotify_endpoint_label, max_values=SPOTIFY_ENDPOINT_LABEL_MAX)
+# Top items are already bounded by rank, so track ids are memoized but never folded.
+_track_id_label = _LabelCache("track_id", _clean_track_id)
+
+
 def _mode_for_top(mode: str) -> str:
     m = (mode or "").strip().lower()
     return m if m in TOP_ITEM_MODES else "partybox"
@@ -89,6 +188,12 @@ partybox_http_request_duration_seconds = Histogram(
     ("method", "route"),
 )
 
+partybox_metrics_cardinality_capped_total = Counter(
+    "partybox_metrics_cardinality_capped_total",
+    "Distinct label values folded into __other__ after a label hit its cardinality cap.",
+    ("label",),
+)
+
 partybox_mode = Gauge(
     "partybox_mode",
     "Active PartyBox mode. Exactly one mode should be 1.",
@@ -122,16 +227,41 @@ partybox_spotify_api_requests_total = Counter(
     ("endpoint", "status"),
 )
 
-partybox_spotify_rate_limited_total = Counter(
-    "partybox_spotify_rate_limited_total",
-    "Number of Spotify 429 responses seen (legacy name).",
-)
-
 partybox_spotify_rate_limit_total = Counter(
     "partybox_spotify_rate_limit_total",
     "Number of Spotify 429 responses seen.",
 )
 
+
+class _CounterAliasCollector(Collector):
+    """Re-exports an unlabelled counter under a deprecated name at scrape time."""
+
+    def __init__(self, name: str, documentation: str, source: Counter) -> None:
+        self._name = name
+        self._documentation = documentation
+        self._source = source
+
+    def describe(self) -> Iterator[CounterMetricFamily]:
+        return iter((CounterMetricFamily(self._name, self._documentation),))
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        value = 0.0
+        for family in self._source.collect():
+            for sample in family.samples:
+                if sample.name.endswith("_total"):
+                    value = sample.value
+        return iter((CounterMetricFamily(self._name, self._documentation, value=value),))
+
+
+# Deprecated: kept for existing dashboards; use partybox_spotify_rate_limit_total.
+REGISTRY.register(
+    _CounterAliasCollector(
+        "partybox_spotify_rate_limited",
+        "Number of Spotify 429 responses seen (legacy name).",
+        partybox_spotify_rate_limit_total,
+    )
+)
+
 partybox_spotify_api_errors_total = Counter(
     "partybox_spotify_api_errors_total",
     "Spotify API error responses by status.",
@@ -214,17 +344,66 @@ partybox_play_history_events_total = Counter(
     ("mode",),
 )
 
-partybox_top_item_plays = Gauge(
-    "partybox_top_item_plays",
-    "Current top item play counts by mode/rank.",
-    ("mode", "rank", "track_id"),
-)
+TopRow = Tuple[str, str, str, str, int]  # (rank, track_id, title, artist, plays)
+
+
+class TopItemsCollector(Collector):
+    """
+    Emits the top-item families at scrape time from the latest rows per mode.
+    Updates swap a list instead of touching one labelled child per rank, and
+    items that leave the chart disappear without any removal bookkeeping.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Tuple[TopRow, ...]] = {}
+
+    def set_rows(self, mode: str, rows: List[TopRow]) -> None:
+        # Copy-on-write: writers serialize on the lock and publish a new dict,
+        # so collect() only needs a single attribute read.
+        with self._lock:
+            updated = dict(self._rows)
+            updated[mode] = tuple(rows)
+            self._rows = updated
+
+    def describe(self) -> Iterator[GaugeMetricFamily]:
+        return iter(self._families())
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        plays, info, meta = self._families()
+        for mode, rows in self._rows.items():
+            for rank, track_id, title, artist, count in rows:
+                plays.add_metric([mode, rank, track_id], count)
+                info.add_metric([mode, rank, track_id], 1)
+                meta.add_metric([mode, rank, title, artist], 1)
+        return iter((plays, info, meta))
+
+    @staticmethod
+    def _families() -> Tuple[GaugeMetricFamily, GaugeMetricFamily, GaugeMetricFamily]:
+        return (
+            GaugeMetricFamily(
+                "partybox_top_item_plays",
+                "Current top item play counts by mode/rank.",
+                labels=("mode", "rank", "track_id"),
+            ),
+            GaugeMetricFamily(
+                "partybox_top_item_info",
+                "Current top item track id by mode/rank.",
+                labels=("mode", "rank", "track_id"),
+            ),
+            GaugeMetricFamily(
+                "partybox_top_item_meta",
+                "Current top item title/artist by mode/rank (one series per rank).",
+                labels=("mode", "rank", "title", "artist"),
+            ),
+        )
 
-partybox_top_item_info = Gauge(
-    "partybox_top_item_info",
-    "Current top item metadata by mode/rank.",
-    ("mode", "rank", "track_id", "title", "artist"),
-)
+
+_TOP_RANK_LABELS = tuple(_rank_label(i) for i in range(1, TOP_ITEM_LIMIT_MAX + 1))
+_EMPTY_TOP_ROWS: Tuple[TopRow, ...] = tuple((rank, "(none)", "", "", 0) for rank in _TOP_RANK_LABELS)
+
+top_items_collector = TopItemsCollector()
+REGISTRY.register(top_items_collector)
 
 partybox_uptime_seconds = Gauge(
     "partybox_uptime_seconds",
@@ -239,38 +418,49 @@ partybox_build_info = Gauge(
 
 
 def observe_http_request(method: str, route: str, status: int, duration_seconds: float) -> None:
-    partybox_http_requests_total.labels(
-        method=_normalize_method(method),
-        route=_normalize_route(route),
-        status=_normalize_status(status),
-    ).inc()
-    partybox_http_request_duration_seconds.labels(
-        method=_normalize_method(method),
-        route=_normalize_route(route),
-    ).observe(max(0.0, float(duration_seconds)))
+    m = _normalize_method(method)
+    r = _normalize_route(route)
+    partybox_http_requests_total.labels(m, r, _normalize_status(status)).inc()
+    partybox_http_request_duration_seconds.labels(m, r).observe(_nn_float(duration_seconds))
 
 
 def observe_http_exception(route: str, exc_type: str) -> None:
     partybox_http_exceptions_total.labels(
-        route=_normalize_route(route),
-        exc_type=_clean_label(exc_type, fallback="exception", max_len=64),
+        _normalize_route(route),
+        _clean_label(exc_type, fallback="exception", max_len=64),
     ).inc()
 
 
+_MODE_CHILDREN = {m: partybox_mode.labels(m) for m in MEDIA_MODES}
+_CURRENT_MODE: str | None = None
+# Scrapes and mode switches call set_mode concurrently; the read-modify-write
+# must be atomic or two children can be left at 1.
+_MODE_LOCK = threading.Lock()
+
+
 def set_mode(active_mode: str) -> None:
+    # At most one mode is active, so a change only needs to clear the previous
+    # child and raise the new one.
+    global _CURRENT_MODE
     current = (active_mode or "").strip().lower()
-    for mode in MEDIA_MODES:
-        partybox_mode.labels(mode=mode).set(1 if mode == current else 0)
+    with _MODE_LOCK:
+        if current == _CURRENT_MODE:
+            return
+        prev = _MODE_CHILDREN.get(_CURRENT_MODE or "")
+        if prev is not None:
+            prev.set(0)
+        child = _MODE_CHILDREN.get(current)
+        if child is not None:
+            child.set(1)
+        _CURRENT_MODE = current
 
 
 def set_queue_depth(depth: int) -> None:
-    partybox_queue_depth.set(max(0, int(depth or 0)))
+    partybox_queue_depth.set(_nn_int(depth))
 
 
 def inc_queue_add(source: str) -> None:
-    partybox_queue_add_total.labels(
-        source=_clean_label(source, fallback="unknown", max_len=32)
-    ).inc()
+    partybox_queue_add_total.labels(_clean_label(source, fallback="unknown", max_len=32)).inc()
 
 
 def inc_queue_play() -> None:
@@ -282,14 +472,10 @@ def set_spotify_ok(ok: bool) -> None:
 
 
 def observe_spotify_api_request(endpoint: str, status: int | str) -> None:
-    partybox_spotify_api_requests_total.labels(
-        endpoint=_normalize_spotify_endpoint(endpoint),
-        status=_normalize_status(status),
-    ).inc()
+    partybox_spotify_api_requests_total.labels(_normalize_spotify_endpoint(endpoint), _normalize_status(status)).inc()
 
 
 def observe_spotify_rate_limited() -> None:
-    partybox_spotify_rate_limited_total.inc()
     partybox_spotify_rate_limit_total.inc()
 
 
@@ -297,11 +483,11 @@ def observe_spotify_api_error(status: int | str) -> None:
     s = _normalize_status(status)
     if s == "429":
         return
-    partybox_spotify_api_errors_total.labels(status=s).inc()
+    partybox_spotify_api_errors_total.labels(s).inc()
 
 
 def set_spotify_last_rate_limit_retry_after_seconds(seconds: int | float) -> None:
-    partybox_spotify_last_rate_limit_retry_after_seconds.set(max(0.0, float(seconds or 0)))
+    partybox_spotify_last_rate_limit_retry_after_seconds.set(_nn_float(seconds))
 
 
 def set_spotify_device_visible(visible: bool) -> None:
@@ -313,15 +499,11 @@ def set_tv_ok(ok: bool) -> None:
 
 
 def inc_tv_command(cmd: str) -> None:
-    partybox_tv_commands_total.labels(
-        cmd=_clean_label(cmd, fallback="unknown", max_len=40)
-    ).inc()
+    partybox_tv_commands_total.labels(_clean_label(cmd, fallback="unknown", max_len=40)).inc()
 
 
 def inc_tv_error(error_type: str) -> None:
-    partybox_tv_errors_total.labels(
-        type=_clean_label(error_type, fallback="unknown", max_len=40)
-    ).inc()
+    partybox_tv_errors_total.labels(_clean_label(error_type, fallback="unknown", max_len=40)).inc()
 
 
 def set_db_ok(ok: bool) -> None:
@@ -329,90 +511,73 @@ def set_db_ok(ok: bool) -> None:
 
 
 def set_last_mode_change_timestamp(ts_seconds: int | float) -> None:
-    partybox_last_mode_change_timestamp_seconds.set(max(0.0, float(ts_seconds or 0)))
+    partybox_last_mode_change_timestamp_seconds.set(_nn_float(ts_seconds))
 
 
 def set_spotify_last_success_timestamp(ts_seconds: int | float) -> None:
-    partybox_spotify_last_success_timestamp_seconds.set(max(0.0, float(ts_seconds or 0)))
+    partybox_spotify_last_success_timestamp_seconds.set(_nn_float(ts_seconds))
 
 
 def set_last_queue_add_timestamp(ts_seconds: int | float) -> None:
-    partybox_last_queue_add_timestamp_seconds.set(max(0.0, float(ts_seconds or 0)))
+    partybox_last_queue_add_timestamp_seconds.set(_nn_float(ts_seconds))
 
 
 def set_last_error_timestamp(ts_seconds: int | float) -> None:
-    partybox_last_error_timestamp_seconds.set(max(0.0, float(ts_seconds or 0)))
+    partybox_last_error_timestamp_seconds.set(_nn_float(ts_seconds))
+
+
+_EXT_STREAM_ACTIVE = {m: partybox_external_stream_active.labels(m) for m in EXTERNAL_META_MODES}
+_EXT_METADATA_AVAILABLE = {m: partybox_external_metadata_available.labels(m) for m in EXTERNAL_META_MODES}
+_EXT_LAST_PLAY_TS = {m: partybox_external_last_play_timestamp_seconds.labels(m) for m in EXTERNAL_META_MODES}
+
+
+def _external_child(children: Dict[str, Gauge], gauge: Gauge, mode: str) -> Gauge:
+    child = children.get(mode)
+    if child is None:
+        child = gauge.labels(_clean_label(mode, fallback="unknown", max_len=20))
+    return child
 
 
 def set_external_stream_active(mode: str, active: bool) -> None:
-    m = _clean_label(mode, fallback="unknown", max_len=20)
-    partybox_external_stream_active.labels(mode=m).set(1 if bool(active) else 0)
+    _external_child(_EXT_STREAM_ACTIVE, partybox_external_stream_active, mode).set(1 if bool(active) else 0)
 
 
 def set_external_metadata_available(mode: str, available: bool) -> None:
-    m = _clean_label(mode, fallback="unknown", max_len=20)
-    partybox_external_metadata_available.labels(mode=m).set(1 if bool(available) else 0)
+    _external_child(_EXT_METADATA_AVAILABLE, partybox_external_metadata_available, mode).set(
+        1 if bool(available) else 0
+    )
 
 
 def set_external_last_play_timestamp(mode: str, ts_seconds: int | float) -> None:
-    m = _clean_label(mode, fallback="unknown", max_len=20)
-    partybox_external_last_play_timestamp_seconds.labels(mode=m).set(max(0.0, float(ts_seconds or 0)))
+    _external_child(_EXT_LAST_PLAY_TS, partybox_external_last_play_timestamp_seconds, mode).set(
+        _nn_float(ts_seconds)
+    )
 
 
 def inc_play_history_event(mode: str) -> None:
     m = _clean_label(mode, fallback="unknown", max_len=20)
-    partybox_play_history_events_total.labels(mode=m).inc()
+    partybox_play_history_events_total.labels(m).inc()
 
 
 def set_top_items(mode: str, items: List[Dict[str, object]], limit: int = TOP_ITEM_LIMIT_DEFAULT) -> None:
     m = _mode_for_top(mode)
-    safe_limit = max(1, min(50, int(limit or TOP_ITEM_LIMIT_DEFAULT)))
-    normalized: List[Dict[str, object]] = []
-    for row in items[:safe_limit]:
-        normalized.append(
-            {
-                "track_id": _track_id_label(str(row.get("track_id") or "")),
-                "title": _clean_text(str(row.get("title") or ""), max_len=180),
-                "artist": _clean_text(str(row.get("artist") or ""), max_len=120),
-                "plays": int(row.get("plays") or 0),
-            }
+    safe_limit = max(1, min(TOP_ITEM_LIMIT_MAX, int(limit or TOP_ITEM_LIMIT_DEFAULT)))
+    rows: List[TopRow] = [
+        (
+            _TOP_RANK_LABELS[idx],
+            _track_id_label(str(row.get("track_id") or "")),
+            _clean_text(str(row.get("title") or ""), max_len=180),
+            _clean_text(str(row.get("artist") or ""), max_len=120),
+            _nn_int(row.get("plays")),
         )
-    while len(normalized) < safe_limit:
-        normalized.append({"track_id": "(none)", "title": "", "artist": "", "plays": 0})
-
-    for idx, row in enumerate(normalized, start=1):
-        rank = _rank_label(idx)
-        track_id = str(row["track_id"])
-        title = str(row["title"])
-        artist = str(row["artist"])
-        plays = max(0, int(row["plays"]))
-        key = (m, rank)
-        prev = _TOP_PREVIOUS_LABELS.get(key)
-        curr = (track_id, title, artist)
-        if prev and prev != curr:
-            prev_track, prev_title, prev_artist = prev
-            partybox_top_item_plays.labels(mode=m, rank=rank, track_id=prev_track).set(0)
-            partybox_top_item_info.labels(
-                mode=m,
-                rank=rank,
-                track_id=prev_track,
-                title=prev_title,
-                artist=prev_artist,
-            ).set(0)
-
-        partybox_top_item_plays.labels(mode=m, rank=rank, track_id=track_id).set(plays)
-        partybox_top_item_info.labels(
-            mode=m,
-            rank=rank,
-            track_id=track_id,
-            title=title,
-            artist=artist,
-        ).set(1)
-        _TOP_PREVIOUS_LABELS[key] = curr
+        for idx, row in enumerate(items[:safe_limit])
+    ]
+    rows.extend(_EMPTY_TOP_ROWS[len(rows):safe_limit])
+    top_items_collector.set_rows(m, rows)
 
 
 def update_uptime() -> None:
-    partybox_uptime_seconds.set(max(0.0, time.time() - START_TIME))
+    partybox_uptime_seconds.set(time.monotonic() - START_MONOTONIC)
 
 
 def render_metrics() -> bytes:
@@ -420,27 +585,11 @@ def render_metrics() -> bytes:
     return generate_latest()
 
 
-for _mode in MEDIA_MODES:
-    partybox_mode.labels(mode=_mode).set(0)
-for _top_mode in TOP_ITEM_MODES:
-    set_top_items(_top_mode, [], limit=TOP_ITEM_LIMIT_DEFAULT)
-
-partybox_queue_depth.set(0)
-partybox_spotify_ok.set(0)
-partybox_spotify_last_rate_limit_retry_after_seconds.set(0)
-partybox_spotify_device_visible.set(0)
-partybox_tv_ok.set(0)
+# Unlabelled gauges start at 0 and the mode/external children above are created
+# at import, so only non-zero defaults need writing here. Top items stay absent
+# until the first refresh populates them.
 partybox_db_ok.set(1)
-partybox_last_mode_change_timestamp_seconds.set(0)
-partybox_spotify_last_success_timestamp_seconds.set(0)
-partybox_last_queue_add_timestamp_seconds.set(0)
-partybox_last_error_timestamp_seconds.set(0)
-for _mode in EXTERNAL_META_MODES:
-    partybox_external_stream_active.labels(mode=_mode).set(0)
-    partybox_external_metadata_available.labels(mode=_mode).set(0)
-    partybox_external_last_play_timestamp_seconds.labels(mode=_mode).set(0)
-partybox_uptime_seconds.set(0)
 partybox_build_info.labels(
-    version=(os.getenv("PARTYBOX_VERSION", "unknown") or "unknown").strip() or "unknown",
-    git_sha=(os.getenv("PARTYBOX_GIT_SHA", "unknown") or "unknown").strip() or "unknown",
+    (os.getenv("PARTYBOX_VERSION", "unknown") or "unknown").strip() or "unknown",
+    (os.getenv("PARTYBOX_GIT_SHA", "unknown") or "unknown").strip() or "unknown",
 ).set(1)
@@ -1,21 +1,136 @@
 from __future__ import annotations
 
 import base64
+import functools
+import http.client
 import json
+import logging
+import logging.handlers
 import os
+import queue
 import re
+import ssl
+import sys
+import threading
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:  # optional: parses straight from bytes, noticeably faster on /me/player
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
 
 from . import metrics as METRICS
 
+_WS_RE = re.compile(r"\s+")
+
+# Per-call HTTP log lines go through a queue so the poll loop only enqueues;
+# a listener thread does the stdout writes. SPOTIFY_HTTP_LOG_LEVEL=WARNING
+# silences them entirely.
+_HTTP_LOG = logging.getLogger("partybox.spotify_http")
+_HTTP_LOG.propagate = False
+_http_log_level = logging.getLevelName((os.getenv("SPOTIFY_HTTP_LOG_LEVEL", "INFO") or "INFO").strip().upper())
+_HTTP_LOG.setLevel(_http_log_level if isinstance(_http_log_level, int) else logging.INFO)
+_HTTP_LOG_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_HTTP_LOG.addHandler(logging.handlers.QueueHandler(_HTTP_LOG_QUEUE))
+# The listener thread only runs while some client is open (see SpotifyClient
+# __init__/close), so importing this module starts no threads.
+_http_log_lock = threading.Lock()
+_http_log_listener: Optional[logging.handlers.QueueListener] = None
+_http_log_users = 0
+
+
+def _acquire_http_log() -> None:
+    global _http_log_listener, _http_log_users
+    with _http_log_lock:
+        _http_log_users += 1
+        if _http_log_listener is None:
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(logging.Formatter("[spotify_http] %(message)s"))
+            _http_log_listener = logging.handlers.QueueListener(_HTTP_LOG_QUEUE, stream)
+            _http_log_listener.start()
+
+
+def _release_http_log() -> None:
+    global _http_log_listener, _http_log_users
+    with _http_log_lock:
+        _http_log_users -= 1
+        if _http_log_users > 0 or _http_log_listener is None:
+            return
+        listener, _http_log_listener = _http_log_listener, None
+    # Flushes whatever is still queued before the thread exits.
+    listener.stop()
+
+
+# One verifying context for every connection: the trust store is loaded once
+# and TLS sessions can be resumed when a pooled connection is reopened.
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.check_hostname = True
+
+
+@functools.lru_cache(maxsize=32)
+def _normalize_name(name: str) -> str:
+    return _WS_RE.sub(" ", (name or "").strip()).casefold()
+
+
+@functools.lru_cache(maxsize=32)
+def _split_url(url: str) -> Tuple[str, str]:
+    # Only a handful of distinct URLs are ever requested, so parse each once.
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    return parts.netloc, path
+
 
 class SpotifyClient:
     TOKEN_URL = "https://accounts.spotify.com/api/token"
     API_BASE = "https://api.spotify.com/v1"
+    # Idle keep-alive connections kept per host (accounts + api).
+    POOL_MAXSIZE = 4
+    IDLE_CACHE_MAX_SECONDS = 120.0
+
+    # Every attribute is assigned in __init__ (app.py only rebinds existing
+    # ones from the auth callback), so drop the per-instance __dict__.
+    __slots__ = (
+        "client_id",
+        "client_secret",
+        "refresh_token",
+        "device_name",
+        "device_id",
+        "_expected_device_norm",
+        "cache_seconds",
+        "_effective_cache_seconds",
+        "_idle_streak",
+        "timeout_seconds",
+        "enabled",
+        "_access_token",
+        "_access_token_expires_at",
+        "_auth_header",
+        "_token_request_cache",
+        "_cache_state",
+        "_cache_ts",
+        "_last_fetch_ts",
+        "_me_cache",
+        "_me_cache_ts",
+        "_empty_templates",
+        "_last_track_block",
+        "_cooldown_until",
+        "_cooldown_reason",
+        "_etag_cache",
+        "_api_urls",
+        "_conn_lock",
+        "_idle_conns",
+        "_poller",
+        "_poller_lock",
+        "_wake",
+        "_closed",
+        "_demand_ts",
+        "_refreshed",
+        "_generation",
+        "_attempts",
+    )
 
     def __init__(
         self,
@@ -32,13 +147,21 @@ class SpotifyClient:
         self.refresh_token = (refresh_token or "").strip()
         self.device_name = (device_name or "PartyBox").strip()
         self.device_id = (device_id or "").strip()
+        self._expected_device_norm = _normalize_name(self.device_name)
         self.cache_seconds = max(1.0, float(cache_seconds or 15.0))
+        # Widened while nothing is playing (see _refresh); reset on playback.
+        self._effective_cache_seconds = self.cache_seconds
+        self._idle_streak = 0
         self.timeout_seconds = max(0.5, float(timeout_seconds or 2.0))
 
         self.enabled = bool(self.client_id and self.client_secret and self.refresh_token)
 
         self._access_token: str = ""
         self._access_token_expires_at: float = 0.0
+        # Rebuilt (never mutated) on each token refresh so concurrent readers
+        # always see a consistent header dict.
+        self._auth_header: Dict[str, str] = {}
+        self._token_request_cache: Optional[Tuple[Tuple[str, str, str], Dict[str, str], bytes]] = None
 
         self._cache_state: Optional[Dict[str, Any]] = None
         self._cache_ts: float = 0.0
@@ -46,10 +169,40 @@ class SpotifyClient:
 
         self._me_cache: Optional[Dict[str, Any]] = None
         self._me_cache_ts: float = 0.0
+        self._empty_templates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_track_block: Optional[Tuple[Any, Dict[str, Any], Dict[str, str]]] = None
 
         self._cooldown_until: float = 0.0
         self._cooldown_reason: str = ""
 
+        # path -> (etag, parsed payload) for conditional GETs; a 304 reuses the
+        # dict parsed from the last 200 (payloads are never mutated).
+        self._etag_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._api_urls: Dict[str, str] = {
+            path: f"{self.API_BASE}{path}" for path in ("/me", "/me/player", "/me/player/currently-playing")
+        }
+
+        # Polling always hits the same two hosts, so reuse TLS connections
+        # instead of paying a handshake on every call.
+        self._conn_lock = threading.Lock()
+        self._idle_conns: Dict[str, List[http.client.HTTPSConnection]] = {}
+
+        # Live fetches happen on one background poller thread; request threads
+        # only read the published _cache_state and nudge the poller via _wake.
+        self._poller: Optional[threading.Thread] = None
+        self._poller_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._demand_ts: float = 0.0
+        # _generation is bumped each time the poller publishes, _attempts each
+        # time it handles a wake (published, failed or skipped). Forced callers
+        # wait on _attempts so any number of them share a single fetch and a
+        # failure releases them straight away.
+        self._refreshed = threading.Condition()
+        self._generation = 0
+        self._attempts = 0
+        _acquire_http_log()
+
     @classmethod
     def from_env(cls) -> "SpotifyClient":
         cache_raw = os.getenv("SPOTIFY_CACHE_SECONDS", "").strip()
@@ -66,37 +219,51 @@ class SpotifyClient:
             timeout_seconds=float(os.getenv("SPOTIFY_TIMEOUT_SECONDS", "2") or "2"),
         )
 
-    def _cooldown_remaining(self) -> int:
-        return max(0, int(self._cooldown_until - time.time()))
+    # Internal deadlines (_cache_ts, _last_fetch_ts, _cooldown_until, token and
+    # /me expiry) run on time.monotonic(); wall-clock time is only used for the
+    # user-visible "ts" field.
+    def _cooldown_remaining(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.monotonic()
+        return max(0, int(self._cooldown_until - now))
 
-    def _metrics(self) -> Dict[str, Any]:
+    def _metrics(self, now: float) -> Dict[str, Any]:
         age: Optional[int] = None
         if self._last_fetch_ts > 0:
-            age = max(0, int(time.time() - self._last_fetch_ts))
+            age = max(0, int(now - self._last_fetch_ts))
         return {
             "last_fetch_age_s": age,
-            "cooldown_remaining_s": self._cooldown_remaining(),
+            "cooldown_remaining_s": self._cooldown_remaining(now),
         }
 
-    def _decorate(self, payload: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    def _decorate(
+        self,
+        payload: Dict[str, Any],
+        cached: bool,
+        overrides: Optional[Dict[str, Any]] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        # The single shallow copy handed to callers; cached payloads are never
+        # mutated in place, so they can be passed in without copying first.
         out = dict(payload or {})
+        if overrides:
+            out.update(overrides)
         out["cached"] = bool(cached)
-        out.update(self._metrics())
+        out.update(self._metrics(time.monotonic() if now is None else now))
         return out
 
     def get_state(self, force: bool = False, allow_fetch: bool = True) -> Dict[str, Any]:
         if not self.enabled:
             return self._decorate(self._empty_state(ok=False, state="disabled", error="spotify_not_configured"), cached=True)
 
-        remaining = self._cooldown_remaining()
+        now = time.monotonic()
+        remaining = self._cooldown_remaining(now)
         if remaining > 0:
             if self._cache_state is not None:
-                stale = dict(self._cache_state)
-                stale["state"] = "cooldown"
-                stale["cooldown_remaining_s"] = remaining
+                overrides: Dict[str, Any] = {"state": "cooldown", "cooldown_remaining_s": remaining}
                 if self._cooldown_reason:
-                    stale["error"] = self._cooldown_reason
-                return self._decorate(stale, cached=True)
+                    overrides["error"] = self._cooldown_reason
+                return self._decorate(self._cache_state, cached=True, overrides=overrides, now=now)
 
             return self._decorate(
                 self._empty_state(
@@ -105,32 +272,111 @@ class SpotifyClient:
                     error=self._cooldown_reason or f"Too Many Requests (retry in {remaining}s)",
                 ),
                 cached=True,
+                now=now,
             )
 
-        if not allow_fetch:
-            if self._cache_state is not None:
-                return self._decorate(dict(self._cache_state), cached=True)
-            return self._decorate(self._empty_state(ok=True, state="idle"), cached=True)
-
-        now = time.time()
-        if (not force) and self._cache_state is not None and (now - self._cache_ts) < self.cache_seconds:
-            return self._decorate(dict(self._cache_state), cached=True)
-
+        state = self._cache_state
+        fresh = False
+        if allow_fetch:
+            # The poller stops refreshing after 2x cache_seconds without demand,
+            # so the first call after such a gap must not be served its leftovers.
+            was_idle = (now - self._demand_ts) >= 2 * self.cache_seconds
+            stale = state is not None and (now - self._cache_ts) >= self._effective_cache_seconds
+            self._demand_ts = now
+            self._ensure_poller()
+            if force or state is None or (was_idle and stale):
+                state, fresh = self._await_refresh()
+                now = time.monotonic()
+            elif stale:
+                self._wake.set()
+
+        if state is None:
+            return self._decorate(self._empty_state(ok=True, state="idle"), cached=True, now=now)
+        # cached=False only when this call waited on a fetch that published.
+        return self._decorate(state, cached=not fresh, now=now)
+
+    def _await_refresh(self) -> Tuple[Optional[Dict[str, Any]], bool]:
+        # Single-flight: wake the poller and wait for its next attempt rather
+        # than fetching here, so concurrent forced calls cost one request.
+        # Returns the current snapshot and whether that attempt published it.
+        with self._refreshed:
+            attempt = self._attempts
+            gen = self._generation
+            self._wake.set()
+            self._refreshed.wait_for(lambda: self._attempts != attempt, timeout=self.timeout_seconds + 1)
+            return self._cache_state, self._generation != gen
+
+    def _ensure_poller(self) -> None:
+        if self._poller is not None or self._closed:
+            return
+        with self._poller_lock:
+            if self._poller is None and not self._closed:
+                self._poller = threading.Thread(target=self._poll_loop, name="spotify-poller", daemon=True)
+                self._poller.start()
+
+    def _poll_timeout(self) -> Optional[float]:
+        now = time.monotonic()
+        if self._cache_state is None or (now - self._demand_ts) >= 2 * self.cache_seconds:
+            # Nobody has asked for live state lately (e.g. PartyBox left
+            # Spotify mode): sleep until the next get_state wakes us.
+            return None
+        due = self._effective_cache_seconds - (now - self._cache_ts)
+        return max(0.05, due, float(self._cooldown_remaining(now)))
+
+    def _poll_loop(self) -> None:
+        while True:
+            forced = self._wake.wait(self._poll_timeout())
+            self._wake.clear()
+            if self._closed:
+                return
+            now = time.monotonic()
+            if not self.enabled or self._cooldown_remaining(now) > 0:
+                self._finish_attempt(published=False)
+                continue
+            if not forced and (now - self._demand_ts) >= 2 * self.cache_seconds:
+                continue
+            try:
+                self._refresh(now)
+            except Exception:
+                # Back off a full window rather than spinning on a persistent error.
+                self._cache_ts = now
+                self._finish_attempt(published=False)
+            else:
+                self._finish_attempt(published=True)
+
+    def _finish_attempt(self, published: bool) -> None:
+        with self._refreshed:
+            self._attempts += 1
+            if published:
+                self._generation += 1
+            self._refreshed.notify_all()
+
+    def _refresh(self, now: float) -> None:
         state = self._fetch_live_state()
         self._last_fetch_ts = now
 
         if not bool(state.get("ok")) and self._cache_state is not None:
+            # Copy-on-write: publish a new stale dict rather than editing the cached one.
             stale = dict(self._cache_state)
             stale["state"] = "cooldown" if self._cooldown_remaining() > 0 else str(state.get("state") or "error")
             if state.get("error"):
                 stale["error"] = str(state.get("error"))
-            self._cache_state = dict(stale)
-            self._cache_ts = now
-            return self._decorate(stale, cached=True)
+            state = stale
+
+        # Paused/inactive state rarely changes: from the second idle poll in a
+        # row, double the window on every idle poll, up to IDLE_CACHE_MAX_SECONDS.
+        if state.get("state") in ("paused", "inactive", "cooldown"):
+            self._idle_streak += 1
+        else:
+            self._idle_streak = 0
+        if self._idle_streak >= 2:
+            widened = min(self._effective_cache_seconds * 2, self.IDLE_CACHE_MAX_SECONDS)
+            self._effective_cache_seconds = max(self.cache_seconds, widened)
+        else:
+            self._effective_cache_seconds = self.cache_seconds
 
-        self._cache_state = dict(state)
         self._cache_ts = now
-        return self._decorate(dict(state), cached=False)
+        self._cache_state = state
 
     def _empty_state(self, ok: bool, state: str, error: str = "") -> Dict[str, Any]:
         payload: Dict[str, Any] = {
@@ -159,6 +405,47 @@ class SpotifyClient:
             pass
         return out
 
+    def _new_conn(self, host: str) -> http.client.HTTPSConnection:
+        return http.client.HTTPSConnection(host, timeout=self.timeout_seconds, context=_SSL_CTX)
+
+    def _acquire_conn(self, host: str) -> Tuple[http.client.HTTPSConnection, bool]:
+        with self._conn_lock:
+            idle = self._idle_conns.get(host)
+            if idle:
+                return idle.pop(), True
+        return self._new_conn(host), False
+
+    def _release_conn(self, host: str, conn: http.client.HTTPSConnection) -> None:
+        with self._conn_lock:
+            idle = self._idle_conns.setdefault(host, [])
+            if len(idle) < self.POOL_MAXSIZE:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        if not self._closed:
+            _release_http_log()
+        self._closed = True
+        self._wake.set()
+        with self._conn_lock:
+            conns = [c for idle in self._idle_conns.values() for c in idle]
+            self._idle_conns.clear()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _decode_json(body: bytes) -> Optional[Dict[str, Any]]:
+        if orjson is not None:
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass  # e.g. stray invalid UTF-8; the lenient path below copes
+        return json.loads(body.decode("utf-8", errors="ignore"))
+
     def _http_json(
         self,
         method: str,
@@ -166,42 +453,63 @@ class SpotifyClient:
         headers: Optional[Dict[str, str]] = None,
         data: Optional[bytes] = None,
     ) -> Tuple[int, Optional[Dict[str, Any]], str, Dict[str, str]]:
-        req = urllib.request.Request(url, method=method, headers=headers or {}, data=data)
+        host, path = _split_url(url)
+        conn, reused = self._acquire_conn(host)
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as resp:
-                status = int(getattr(resp, "status", 0) or 0)
-                hdrs = self._to_headers_map(resp.headers)
-                body = resp.read() or b""
-                if not body:
-                    return status, None, "", hdrs
-                try:
-                    return status, json.loads(body.decode("utf-8", errors="ignore")), "", hdrs
-                except Exception:
-                    return status, None, "invalid_json", hdrs
-        except urllib.error.HTTPError as e:
-            status = int(getattr(e, "code", 0) or 0)
-            hdrs = self._to_headers_map(e.headers)
-            raw = b""
             try:
-                raw = e.read() or b""
-            except Exception:
-                pass
+                conn.request(method, path, body=data, headers=headers or {})
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server dropped an idle keep-alive connection; retry once fresh.
+                conn.close()
+                if not reused:
+                    raise
+                # Fresh rather than another pooled one, which may be just as stale.
+                conn = self._new_conn(host)
+                conn.request(method, path, body=data, headers=headers or {})
+                resp = conn.getresponse()
+            status = int(resp.status or 0)
+            hdrs = self._to_headers_map(resp.headers)
+            body = resp.read() or b""
+        except Exception as e:
+            conn.close()
+            return 0, None, str(e), {}
 
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release_conn(host, conn)
+
+        if status >= 400:
             payload = None
-            if raw:
+            if body:
                 try:
-                    payload = json.loads(raw.decode("utf-8", errors="ignore"))
+                    payload = self._decode_json(body)
                 except Exception:
                     payload = None
-            return status, payload, str(e.reason or "http_error"), hdrs
-        except Exception as e:
-            return 0, None, str(e), {}
+            return status, payload, str(resp.reason or "http_error"), hdrs
+
+        if not body:
+            return status, None, "", hdrs
+        try:
+            return status, self._decode_json(body), "", hdrs
+        except Exception:
+            return status, None, "invalid_json", hdrs
+
+    def _cooldown_until_epoch(self) -> int:
+        remaining = self._cooldown_until - time.monotonic()
+        return int(time.time() + remaining) if remaining > 0 else 0
 
     def _log_http_call(self, endpoint: str, status: int, retry_after: int, cached: bool) -> None:
-        print(
-            f"[spotify_http] endpoint={endpoint} status={status} retry_after={retry_after} "
-            f"cached={str(cached).lower()} cooldown_until={int(self._cooldown_until)}",
-            flush=True,
+        if not _HTTP_LOG.isEnabledFor(logging.INFO):
+            return
+        _HTTP_LOG.info(
+            "endpoint=%s status=%s retry_after=%s cached=%s cooldown_until=%d",
+            endpoint,
+            status,
+            retry_after,
+            "true" if cached else "false",
+            self._cooldown_until_epoch(),
         )
 
     def _observe_api_metrics(self, endpoint: str, status: int, retry_after: int) -> None:
@@ -212,9 +520,13 @@ class SpotifyClient:
         if status <= 0 or status >= 400:
             METRICS.observe_spotify_api_error(status)
 
-    def _refresh_access_token(self) -> Tuple[bool, str]:
-        if not self.enabled:
-            return False, "spotify_not_configured"
+    def _token_request(self) -> Tuple[Dict[str, str], bytes]:
+        # Credentials only change when the auth callback stores a new refresh
+        # token, so build the Basic header and form body once per credential set.
+        key = (self.client_id, self.client_secret, self.refresh_token)
+        cached = self._token_request_cache
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
 
         body = urllib.parse.urlencode(
             {
@@ -225,16 +537,19 @@ class SpotifyClient:
 
         basic_raw = f"{self.client_id}:{self.client_secret}".encode("utf-8")
         basic_auth = base64.b64encode(basic_raw).decode("ascii")
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {basic_auth}",
+        }
+        self._token_request_cache = (key, headers, body)
+        return headers, body
 
-        status, payload, err, _ = self._http_json(
-            "POST",
-            self.TOKEN_URL,
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Authorization": f"Basic {basic_auth}",
-            },
-            data=body,
-        )
+    def _refresh_access_token(self) -> Tuple[bool, str]:
+        if not self.enabled:
+            return False, "spotify_not_configured"
+
+        headers, body = self._token_request()
+        status, payload, err, _ = self._http_json("POST", self.TOKEN_URL, headers=headers, data=body)
         self._observe_api_metrics("/api/token", status, 0)
         if status != 200 or not payload:
             if payload:
@@ -248,13 +563,21 @@ class SpotifyClient:
         if not token:
             return False, "token_missing"
 
+        self._auth_header = {"Authorization": f"Bearer {token}"}
         self._access_token = token
-        self._access_token_expires_at = time.time() + max(30, expires_in - 30)
+        self._access_token_expires_at = time.monotonic() + max(30, expires_in - 30)
         return True, ""
 
+    def cached_access_token(self) -> str:
+        """Return the in-memory access token if still valid, without refreshing."""
+        if self._access_token and time.monotonic() < self._access_token_expires_at:
+            return self._access_token
+        return ""
+
     def _get_access_token(self) -> Tuple[Optional[str], str]:
-        if self._access_token and time.time() < self._access_token_expires_at:
-            return self._access_token, ""
+        token = self.cached_access_token()
+        if token:
+            return token, ""
         ok, err = self._refresh_access_token()
         if not ok:
             return None, err
@@ -271,7 +594,7 @@ class SpotifyClient:
         wait_s = retry_after if retry_after > 0 else fallback
         wait_s = max(5, wait_s)
         wait_s = min(wait_s, max(5, max_backoff))
-        self._cooldown_until = time.time() + wait_s
+        self._cooldown_until = time.monotonic() + wait_s
         self._cooldown_reason = f"Too Many Requests (retry in {wait_s}s)"
         return wait_s
 
@@ -284,20 +607,7 @@ class SpotifyClient:
         if not token:
             return 0, None, err or "token_unavailable"
 
-        status, payload, req_err, hdrs = self._http_json(
-            "GET",
-            f"{self.API_BASE}{path}",
-            headers={"Authorization": f"Bearer {token}"},
-            data=None,
-        )
-
-        retry_after = self._parse_retry_after(hdrs)
-        if status == 429:
-            retry_after = self._enter_cooldown(retry_after)
-            req_err = self._cooldown_reason
-
-        self._observe_api_metrics(path, status, retry_after)
-        self._log_http_call(path, status, retry_after, cached=False)
+        status, payload, req_err, hdrs = self._conditional_get(path)
 
         if status == 401 and retry_401:
             self._access_token = ""
@@ -305,24 +615,45 @@ class SpotifyClient:
             token2, err2 = self._get_access_token()
             if not token2:
                 return 401, None, err2 or "token_refresh_failed"
-            status, payload, req_err, hdrs = self._http_json(
-                "GET",
-                f"{self.API_BASE}{path}",
-                headers={"Authorization": f"Bearer {token2}"},
-                data=None,
-            )
-            retry_after = self._parse_retry_after(hdrs)
-            if status == 429:
-                retry_after = self._enter_cooldown(retry_after)
-                req_err = self._cooldown_reason
-            self._observe_api_metrics(path, status, retry_after)
-            self._log_http_call(path, status, retry_after, cached=False)
+            status, payload, req_err, hdrs = self._conditional_get(path)
 
         return status, payload, req_err
 
+    def _conditional_get(self, path: str) -> Tuple[int, Optional[Dict[str, Any]], str, Dict[str, str]]:
+        # Callers have just obtained a valid token, so _auth_header is current.
+        headers = self._auth_header
+        known = self._etag_cache.get(path)
+        if known is not None:
+            headers = {**headers, "If-None-Match": known[0]}
+
+        url = self._api_urls.get(path) or f"{self.API_BASE}{path}"
+        status, payload, req_err, hdrs = self._http_json("GET", url, headers=headers, data=None)
+
+        retry_after = self._parse_retry_after(hdrs)
+        if status == 429:
+            retry_after = self._enter_cooldown(retry_after)
+            req_err = self._cooldown_reason
+
+        self._observe_api_metrics(path, status, retry_after)
+        not_modified = status == 304 and known is not None
+        self._log_http_call(path, status, retry_after, cached=not_modified)
+
+        if not_modified:
+            return 200, known[1], "", hdrs
+        if status == 200 and isinstance(payload, dict):
+            etag = hdrs.get("etag", "")
+            if etag:
+                self._etag_cache[path] = (etag, payload)
+            else:
+                self._etag_cache.pop(path, None)
+        return status, payload, req_err, hdrs
+
+    def _me_fresh(self) -> bool:
+        return self._me_cache is not None and (time.monotonic() - self._me_cache_ts) < 300
+
     def _get_me(self) -> Optional[Dict[str, Any]]:
-        now = time.time()
-        if self._me_cache is not None and (now - self._me_cache_ts) < 300:
+        now = time.monotonic()
+        if self._me_fresh():
             return self._me_cache
 
         status, payload, _ = self._api_get("/me")
@@ -332,14 +663,10 @@ class SpotifyClient:
             return payload
         return self._me_cache
 
-    @staticmethod
-    def _normalize_name(name: str) -> str:
-        return re.sub(r"\\s+", " ", (name or "").strip()).casefold()
-
     def _device_matches(self, device_name: str, device_id: str) -> bool:
         if self.device_id:
             return (device_id or "").strip() == self.device_id
-        return self._normalize_name(device_name) == self._normalize_name(self.device_name)
+        return _normalize_name(device_name) == self._expected_device_norm
 
     @staticmethod
     def _pick_images(item: Dict[str, Any]) -> Dict[str, str]:
@@ -348,48 +675,116 @@ class SpotifyClient:
         if not isinstance(images, list):
             return {"small": "", "medium": "", "large": ""}
 
-        sorted_images = sorted(
-            [im for im in images if isinstance(im, dict) and im.get("url")],
-            key=lambda x: int(x.get("width") or 0),
-        )
-        if not sorted_images:
+        pairs = [
+            (int(im.get("width") or 0), im.get("url") or "")
+            for im in images
+            if isinstance(im, dict) and im.get("url")
+        ]
+        n = len(pairs)
+        if not n:
             return {"small": "", "medium": "", "large": ""}
+        if n > 3:
+            pairs.sort(key=lambda p: p[0])
+            return {"small": pairs[0][1], "medium": pairs[n // 2][1], "large": pairs[-1][1]}
+
+        # Spotify sends three sizes; pick them in one scan. Ties resolve the way
+        # a stable sort would: first smallest, last largest.
+        lo = hi = 0
+        for idx in range(1, n):
+            w = pairs[idx][0]
+            if w < pairs[lo][0]:
+                lo = idx
+            if w >= pairs[hi][0]:
+                hi = idx
+        mid = hi if n < 3 else 3 - lo - hi
+        return {"small": pairs[lo][1], "medium": pairs[mid][1], "large": pairs[hi][1]}
+
+    def _empty_template(self, state: str, me: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Nobody playing (204) and rate limited (429) are the common poll
+        # outcomes; keep one prebuilt payload per (state, account) and hand out
+        # shallow copies with a fresh ts instead of rebuilding the nested dicts.
+        display_name = str(me.get("display_name") or "") if me else ""
+        key = (state, display_name)
+        tmpl = self._empty_templates.get(key)
+        if tmpl is None:
+            tmpl = self._empty_state(ok=(state == "inactive"), state=state)
+            if display_name:
+                tmpl["account"] = {"display_name": display_name}
+            self._empty_templates = {k: v for k, v in self._empty_templates.items() if k[1] == display_name}
+            self._empty_templates[key] = tmpl
+        out = dict(tmpl)
+        out["ts"] = int(time.time())
+        return out
 
-        small = sorted_images[0].get("url") or ""
-        medium = sorted_images[len(sorted_images) // 2].get("url") or ""
-        large = sorted_images[-1].get("url") or ""
-        return {"small": small, "medium": medium, "large": large}
+    def _inactive_state(self, me: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return self._empty_template("inactive", me)
+
+    def _cooldown_state(self, me: Optional[Dict[str, Any]], error: str) -> Dict[str, Any]:
+        out = self._empty_template("cooldown", me)
+        out["error"] = error
+        out["cooldown_remaining_s"] = self._cooldown_remaining()
+        return out
+
+    def _track_block(self, item: Any) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        # A 304 hands back the same parsed payload, so the same item dict comes
+        # round again on most polls; reuse the blocks built from it last time.
+        # Published states are never mutated, so sharing them is safe.
+        last = self._last_track_block
+        if last is not None and last[0] is item:
+            return last[1], last[2]
+
+        if not isinstance(item, dict):
+            item = {}
+        album = item.get("album")
+        if not isinstance(album, dict):
+            album = {}
+        track = {
+            "name": str(item.get("name") or ""),
+            "artists": [str(a["name"]) for a in (item.get("artists") or []) if isinstance(a, dict) and a.get("name")],
+            "album": str(album.get("name") or ""),
+            "duration_ms": int(item.get("duration_ms") or 0),
+            "id": str(item.get("id") or ""),
+            "uri": str(item.get("uri") or ""),
+        }
+        images = self._pick_images(item)
+        self._last_track_block = (item, track, images)
+        return track, images
 
     def _fetch_live_state(self) -> Dict[str, Any]:
-        me = self._get_me()
+        # /me and /me/player are independent; when /me needs refreshing, run it
+        # on a side thread so the poll costs max(t_me, t_player) rather than
+        # the sum. The token is fetched first so the two never race a refresh.
+        me_thread: Optional[threading.Thread] = None
+        me_result: List[Optional[Dict[str, Any]]] = []
+        if not self._me_fresh():
+            token, _ = self._get_access_token()
+            if token:
+                me_thread = threading.Thread(
+                    target=lambda: me_result.append(self._get_me()),
+                    name="spotify-me",
+                    daemon=True,
+                )
+                me_thread.start()
 
         status, payload, err = self._api_get("/me/player")
+
+        if me_thread is not None:
+            me_thread.join()
+            me = me_result[0] if me_result else self._me_cache
+        else:
+            me = self._get_me()
         if status == 204:
-            out = self._empty_state(ok=True, state="inactive")
-            if me and me.get("display_name"):
-                out["account"] = {"display_name": str(me.get("display_name"))}
-            return out
+            return self._inactive_state(me)
 
         if status == 429:
-            out = self._empty_state(ok=False, state="cooldown", error=err or "Too Many Requests")
-            if me and me.get("display_name"):
-                out["account"] = {"display_name": str(me.get("display_name"))}
-            out["cooldown_remaining_s"] = self._cooldown_remaining()
-            return out
+            return self._cooldown_state(me, err or "Too Many Requests")
 
         if status not in (200, 204):
             status2, payload2, err2 = self._api_get("/me/player/currently-playing")
             if status2 == 204:
-                out = self._empty_state(ok=True, state="inactive")
-                if me and me.get("display_name"):
-                    out["account"] = {"display_name": str(me.get("display_name"))}
-                return out
+                return self._inactive_state(me)
             if status2 == 429:
-                out = self._empty_state(ok=False, state="cooldown", error=err2 or "Too Many Requests")
-                if me and me.get("display_name"):
-                    out["account"] = {"display_name": str(me.get("display_name"))}
-                out["cooldown_remaining_s"] = self._cooldown_remaining()
-                return out
+                return self._cooldown_state(me, err2 or "Too Many Requests")
             if status2 != 200 or not payload2:
                 return self._empty_state(ok=False, state="error", error=err2 or err or f"player_status_{status}")
             payload = payload2
@@ -397,23 +792,17 @@ class SpotifyClient:
         if not isinstance(payload, dict):
             return self._empty_state(ok=False, state="error", error="invalid_player_payload")
 
-        device = payload.get("device") if isinstance(payload.get("device"), dict) else {}
+        device = payload.get("device")
+        if not isinstance(device, dict):
+            device = {}
         device_name = str(device.get("name") or "")
         device_id = str(device.get("id") or "")
 
         if not device_name and not device_id:
-            out = self._empty_state(ok=True, state="inactive")
-            if me and me.get("display_name"):
-                out["account"] = {"display_name": str(me.get("display_name"))}
-            return out
+            return self._inactive_state(me)
 
         on_partybox = self._device_matches(device_name, device_id)
-
-        item = payload.get("item") if isinstance(payload.get("item"), dict) else {}
-        artists = []
-        for a in (item.get("artists") or []):
-            if isinstance(a, dict) and a.get("name"):
-                artists.append(str(a.get("name")))
+        track, images = self._track_block(payload.get("item"))
 
         state = "playing" if bool(payload.get("is_playing")) else "paused"
 
@@ -426,16 +815,9 @@ class SpotifyClient:
                 "id": device_id,
                 "volume_percent": int(device.get("volume_percent") or 0),
             },
-            "track": {
-                "name": str(item.get("name") or ""),
-                "artists": artists,
-                "album": str(((item.get("album") or {}) if isinstance(item.get("album"), dict) else {}).get("name") or ""),
-                "duration_ms": int(item.get("duration_ms") or 0),
-                "id": str(item.get("id") or ""),
-                "uri": str(item.get("uri") or ""),
-            },
+            "track": track,
             "progress_ms": int(payload.get("progress_ms") or 0),
-            "images": self._pick_images(item),
+            "images": images,
             "shuffle_state": bool(payload.get("shuffle_state")),
             "repeat_state": str(payload.get("repeat_state") or "off"),
             "ts": int(time.time()),
@@ -2,7 +2,7 @@
 # =============================================================================
 # PartyBox TV Player (mpv)
 #
-# - Polls the local Flask API (/api/state) for what to play
+# - Long-polls the local Flask API (/api/tv/state) for what to play
 # - Plays local media (file:*.mp4) and YouTube (id or URL) via mpv/yt-dlp
 # - Marks queue items playing/done via /api/tv/mark_playing and /api/tv/mark_done
 #
@@ -22,18 +22,50 @@
 
 from __future__ import annotations
 
+import functools
+import http.client
 import json
 import os
+import queue
+import re
 import shlex
 import subprocess
+import threading
 import time
-import urllib.request
-from pathlib import Path
+import urllib.parse
 from typing import Any, Dict, Optional, Tuple
 
+# orjson parses/serializes bytes directly and is much cheaper per poll on small
+# kiosk boxes; fall back to stdlib json with the same bytes-in/bytes-out shape.
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def _json_loads(raw: bytes) -> Any:
+        return json.loads(raw.decode("utf-8", "replace"))
+
 API_BASE = os.getenv("PARTYBOX_API", "http://127.0.0.1:5000").rstrip("/")
 POLL_SECONDS = float(os.getenv("PARTYBOX_POLL_SECONDS", "1.0"))
 HB_EVERY = float(os.getenv("PARTYBOX_HEARTBEAT_SECONDS", "3.0"))
+# One keep-alive connection to the local API instead of a TCP connect per call.
+_API_URL = urllib.parse.urlsplit(API_BASE)
+_API_PREFIX = _API_URL.path.rstrip("/")
+_API_CONN_CLS = http.client.HTTPSConnection if _API_URL.scheme == "https" else http.client.HTTPConnection
+# Shared request headers; callers copy them only to add per-request fields.
+_GET_HEADERS = {"Accept": "application/json"}
+_POST_HEADERS = {**_GET_HEADERS, "Content-Type": "application/json"}
+
+# Long-polls let the server hold /api/tv/state for one heartbeat interval.
+# During playback a watcher thread keeps one open and hands changes to the
+# main loop, which otherwise just waits on mpv.
+# Requests the main loop makes during playback are bounded by this, so a
+# stalled API cannot hold up its reaction to mpv exiting or a queued event.
+PLAYBACK_REQUEST_TIMEOUT = 2.0
 
 # Prefer PARTYBOX_MPV_BIN, but also accept MPV_BIN for backward compatibility
 MPV_BIN = (os.getenv("PARTYBOX_MPV_BIN") or os.getenv("MPV_BIN") or "mpv").strip()
@@ -72,53 +104,236 @@ YTDL_ARGS_OFF = [
     "--ytdl=no",
 ]
 
+# If user wants a specific ALSA device, set it explicitly
+_ALSA_ARGS = (f"--audio-device=alsa/{ALSA_DEVICE}",) if ALSA_DEVICE else ()
 
-def log(msg: str) -> None:
-    print(msg, flush=True)
-
+# Everything but the target is fixed at startup, so build both variants once.
+_CMD_PREFIX_YTDL_ON = (MPV_BIN, *BASE_MPV_ARGS, *YTDL_ARGS_ON, *EXTRA_MPV_ARGS, *_ALSA_ARGS)
+_CMD_PREFIX_YTDL_OFF = (MPV_BIN, *BASE_MPV_ARGS, *YTDL_ARGS_OFF, *EXTRA_MPV_ARGS, *_ALSA_ARGS)
+# Shell-quoted copies for the launch log line.
+_CMD_LOG_PREFIX_YTDL_ON = " ".join(shlex.quote(x) for x in _CMD_PREFIX_YTDL_ON)
+_CMD_LOG_PREFIX_YTDL_OFF = " ".join(shlex.quote(x) for x in _CMD_PREFIX_YTDL_OFF)
 
-def http_json(url: str, method: str = "GET", payload: Optional[dict] = None) -> Dict[str, Any]:
-    data = None
-    headers = {"Accept": "application/json"}
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-        headers["Content-Type"] = "application/json"
 
-    req = urllib.request.Request(url, method=method, data=data, headers=headers)
-    with urllib.request.urlopen(req, timeout=6) as resp:
-        raw = resp.read().decode("utf-8", "replace")
-        return json.loads(raw)
+def log(msg: str) -> None:
+    print(msg, flush=True)
 
 
-def post_heartbeat(mode: str, title: str = "", youtube_id: str = "") -> None:
+class _ApiChannel:
+    """One keep-alive connection to the API; requests on it are serialized."""
+
+    __slots__ = ("conn", "lock")
+
+    def __init__(self) -> None:
+        self.conn: Optional[http.client.HTTPConnection] = None
+        self.lock = threading.Lock()
+
+    def request(
+        self, method: str, path: str, body: Optional[bytes], headers: Dict[str, str], timeout: float
+    ) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        with self.lock:
+            while True:
+                conn = self.conn
+                fresh = conn is None
+                if conn is None:
+                    conn = self.conn = _API_CONN_CLS(_API_URL.hostname or "127.0.0.1", _API_URL.port, timeout=timeout)
+                elif conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                else:
+                    conn.timeout = timeout
+                try:
+                    conn.request(method, _API_PREFIX + path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    return resp.status, resp.headers, resp.read()
+                except (http.client.RemoteDisconnected, ConnectionError):
+                    conn.close()
+                    self.conn = None
+                    # The server may already have acted on a POST (mark_playing
+                    # logs a play event), so only GETs are replayed.
+                    if fresh or method != "GET":
+                        raise
+                except Exception:
+                    conn.close()
+                    self.conn = None
+                    raise
+
+    def close(self) -> None:
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+_api = _ApiChannel()
+
+
+def api_request(
+    method: str,
+    path: str,
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 6.0,
+    channel: Optional[_ApiChannel] = None,
+) -> Tuple[int, http.client.HTTPMessage, bytes]:
+    """
+    Send one request over a keep-alive connection (the shared one unless
+    `channel` is given). A GET on a connection the server has since closed is
+    retried once on a fresh one; other methods raise instead.
+    """
+    return (channel or _api).request(method, path, body, headers or _GET_HEADERS, timeout)
+
+
+def http_json(
+    path: str, method: str = "GET", payload: Optional[dict] = None, timeout: float = 6.0
+) -> Dict[str, Any]:
+    if payload is None:
+        data, headers = None, _GET_HEADERS
+    else:
+        data, headers = _json_dumps(payload), _POST_HEADERS
+
+    status, _, raw = api_request(method, path, body=data, headers=headers, timeout=timeout)
+    if status >= 400:
+        raise http.client.HTTPException(f"{method} {path} -> HTTP {status}")
+    return _json_loads(raw)
+
+
+def post_heartbeat(mode: str, title: str = "", youtube_id: str = "", timeout: float = 6.0) -> None:
     try:
         http_json(
-            f"{API_BASE}/api/tv/heartbeat",
+            "/api/tv/heartbeat",
             method="POST",
             payload={
                 "mode": mode,
                 "title": (title or "")[:120],
                 "youtube_id": (youtube_id or "")[:200],
             },
+            timeout=timeout,
         )
     except Exception:
         pass
 
 
-def mark_playing(queue_id: int) -> None:
-    http_json(f"{API_BASE}/api/tv/mark_playing", method="POST", payload={"queue_id": queue_id})
+def mark_playing(queue_id: int, title: str = "", youtube_id: str = "") -> None:
+    """Mark the queue item playing; the same POST doubles as a "playing" heartbeat."""
+    http_json(
+        "/api/tv/mark_playing",
+        method="POST",
+        payload={
+            "queue_id": queue_id,
+            "mode": "playing",
+            "title": (title or "")[:120],
+            "youtube_id": (youtube_id or "")[:200],
+        },
+    )
+
+
+def mark_done(queue_id: int, title: str = "", youtube_id: str = "") -> None:
+    """Mark the queue item done; the same POST doubles as a "done" heartbeat."""
+    http_json(
+        "/api/tv/mark_done",
+        method="POST",
+        payload={
+            "queue_id": queue_id,
+            "mode": "done",
+            "title": (title or "")[:120],
+            "youtube_id": (youtube_id or "")[:200],
+        },
+    )
+
+
+def get_state_longpoll(
+    etag: str, wait: float, timeout: Optional[float] = None, channel: Optional[_ApiChannel] = None
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Fetch /api/tv/state, letting the server hold the request up to `wait`
+    seconds until it differs from `etag`. Returns (None, etag) if unchanged.
+    `timeout` bounds the whole request (default: wait + 6s).
+    """
+    return _poll_state("GET", "/api/tv/state", None, etag, wait, timeout, channel)
+
+
+def tv_poll(
+    mode: str, title: str, youtube_id: str, etag: str, wait: float, timeout: Optional[float] = None
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Post a heartbeat and long-poll state in the same round-trip (/api/tv/poll)."""
+    body = _json_dumps(
+        {
+            "mode": mode,
+            "title": (title or "")[:120],
+            "youtube_id": (youtube_id or "")[:200],
+        }
+    )
+    return _poll_state("POST", "/api/tv/poll", body, etag, wait, timeout)
+
+
+def _poll_state(
+    method: str,
+    path: str,
+    body: Optional[bytes],
+    etag: str,
+    wait: float,
+    timeout: Optional[float],
+    channel: Optional[_ApiChannel] = None,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    headers = _GET_HEADERS if body is None else _POST_HEADERS
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    status, resp_headers, raw = api_request(
+        method, f"{path}?wait={wait:g}", body=body, headers=headers, timeout=timeout or wait + 6, channel=channel
+    )
+    if status == 304:
+        return None, etag
+    if status >= 400:
+        raise http.client.HTTPException(f"{method} {path} -> HTTP {status}")
+    return _json_loads(raw), resp_headers.get("ETag", "")
 
 
-def mark_done(queue_id: int) -> None:
-    http_json(f"{API_BASE}/api/tv/mark_done", method="POST", payload={"queue_id": queue_id})
+def is_local_token(youtube_id: str) -> bool:
+    return (youtube_id or "").startswith("file:")
 
 
-def get_state() -> Dict[str, Any]:
-    return http_json(f"{API_BASE}/api/state")
+# MEDIA_DIR's file names, rescanned only when the directory's mtime moves
+# (files added/removed/renamed). The mtime itself is checked at most every
+# LOCAL_FILE_RECHECK_SECONDS, so lookups are normally a set membership test.
+LOCAL_FILE_RECHECK_SECONDS = 5.0
+_media_files: frozenset = frozenset()
+_media_dir_mtime_ns: int = -1
+_media_dir_checked: float = float("-inf")
 
+# Media names come straight from the scanned directory, so anything goes
+# except "/" or NUL (a backslash is an ordinary filename character on the
+# Pi); "." and ".." are rejected separately.
+_UNSAFE_NAME_RE = re.compile(r"[/\x00]")
 
-def is_local_token(youtube_id: str) -> bool:
-    return (youtube_id or "").startswith("file:")
+
+def _media_file_names(force: bool = False) -> frozenset:
+    global _media_files, _media_dir_mtime_ns, _media_dir_checked
+    now = time.monotonic()
+    if not force and now - _media_dir_checked < LOCAL_FILE_RECHECK_SECONDS:
+        return _media_files
+    _media_dir_checked = now
+    try:
+        mtime_ns = os.stat(MEDIA_DIR).st_mtime_ns
+    except OSError:
+        _media_files, _media_dir_mtime_ns = frozenset(), -1
+        return _media_files
+    if mtime_ns != _media_dir_mtime_ns:
+        with os.scandir(MEDIA_DIR) as it:
+            _media_files = frozenset(e.name for e in it if e.is_file())
+        _media_dir_mtime_ns = mtime_ns
+    return _media_files
+
+
+@functools.lru_cache(maxsize=128)
+def _local_media_path(name: str) -> Optional[str]:
+    # Pure path logic: the same token always maps to the same path (or None).
+    if name in (".", "..") or _UNSAFE_NAME_RE.search(name):
+        return None
+
+    p = os.path.abspath(os.path.join(MEDIA_DIR, name))
+    if not p.startswith(MEDIA_DIR + os.sep):
+        return None
+    return p
 
 
 def local_path_from_token(youtube_id: str) -> Optional[str]:
@@ -126,14 +341,12 @@ def local_path_from_token(youtube_id: str) -> Optional[str]:
     if not name:
         return None
 
-    safe_name = Path(name).name
-    if safe_name != name:
-        return None
-
-    p = os.path.abspath(os.path.join(MEDIA_DIR, safe_name))
-    if not p.startswith(MEDIA_DIR + os.sep):
+    p = _local_media_path(name)
+    if p is None:
         return None
-    if not os.path.isfile(p):
+    # A miss re-checks the directory straight away so a just-added file is
+    # not reported missing for a whole recheck window.
+    if name not in _media_file_names() and name not in _media_file_names(force=True):
         return None
     return p
 
@@ -147,60 +360,72 @@ def youtube_or_url(youtube_id: str) -> str:
     return f"https://www.youtube.com/watch?v={y}"
 
 
-def pick_item_from_state(state: Dict[str, Any]) -> Tuple[Optional[str], Optional[int], Optional[str], str]:
-    media_mode = (state.get("media_mode") or "").lower()
-    if not media_mode:
-        av_mode = (state.get("av_mode") or "partybox").lower()
-        media_mode = "spotify" if av_mode == "spotify" else "partybox"
-    if media_mode != "partybox":
-        return (None, None, None, media_mode)
-
-    if bool(state.get("paused", False)):
+class ParsedState:
+    """The /api/tv/state fields the agent acts on, parsed once per changed response."""
+
+    __slots__ = ("media_mode", "paused", "queue_id", "youtube_id", "title", "mode")
+
+    def __init__(self, state: Dict[str, Any]) -> None:
+        media_mode = str(state.get("media_mode") or "").lower()
+        if not media_mode:
+            av_mode = str(state.get("av_mode") or "partybox").lower()
+            media_mode = "spotify" if av_mode == "spotify" else "partybox"
+        self.media_mode = media_mode
+        self.paused = bool(state.get("paused", False))
+        self.mode = str(state.get("mode") or "unknown")
+
+        # The API emits queue_id as a JSON int and youtube_id/title as strings;
+        # anything else is treated as missing rather than coerced. youtube_id
+        # stays None when there is no "now" item at all.
+        now = state.get("now") or None
+        self.youtube_id: Optional[str] = None
+        self.queue_id: Optional[int] = None
+        self.title = ""
+        if now:
+            yid = now.get("youtube_id")
+            self.youtube_id = yid if isinstance(yid, str) else ""
+            t = now.get("title")
+            self.title = t if isinstance(t, str) else ""
+            qid = now.get("queue_id")
+            self.queue_id = qid if isinstance(qid, int) else None
+
+
+def pick_item(ps: ParsedState) -> Tuple[Optional[str], Optional[int], Optional[str], str]:
+    if ps.media_mode != "partybox":
+        return (None, None, None, ps.media_mode)
+    if ps.paused:
         return (None, None, None, "paused")
-
-    now = state.get("now") or None
-    if not now:
+    if ps.youtube_id is None:
         return (None, None, None, "empty")
-
-    youtube_id = now.get("youtube_id") or ""
-    title = now.get("title") or ""
-    mode = str(state.get("mode") or "unknown")
-
-    qid = now.get("queue_id", None)
-    queue_id: Optional[int] = None
-    try:
-        if qid is not None:
-            queue_id = int(qid)
-    except Exception:
-        queue_id = None
-
-    return (str(youtube_id), queue_id, str(title), mode)
+    return (ps.youtube_id, ps.queue_id, ps.title, ps.mode)
 
 
 def build_mpv_cmd(target: str, use_ytdl: bool) -> list[str]:
-    ytdl_args = YTDL_ARGS_ON if use_ytdl else YTDL_ARGS_OFF
-    args = [MPV_BIN, *BASE_MPV_ARGS, *ytdl_args, *EXTRA_MPV_ARGS]
-
-    # If user wants a specific ALSA device, set it explicitly
-    if ALSA_DEVICE:
-        args += [f"--audio-device=alsa/{ALSA_DEVICE}"]
-
-    args += [target]
-    return args
+    prefix = _CMD_PREFIX_YTDL_ON if use_ytdl else _CMD_PREFIX_YTDL_OFF
+    return [*prefix, target]
 
 
 def start_mpv(target: str, use_ytdl: bool) -> subprocess.Popen:
     cmd = build_mpv_cmd(target, use_ytdl=use_ytdl)
-    log(f"[tv_player] mpv cmd: {' '.join(shlex.quote(x) for x in cmd)}")
+    log_prefix = _CMD_LOG_PREFIX_YTDL_ON if use_ytdl else _CMD_LOG_PREFIX_YTDL_OFF
+    log(f"[tv_player] mpv cmd: {log_prefix} {shlex.quote(target)}")
+
+    # Set PARTYBOX_MPV_LOG to capture mpv stderr/stdout in a file (e.g. to see
+    # why it exits fast); otherwise it goes to /dev/null.
+    log_path = os.getenv("PARTYBOX_MPV_LOG", "").strip()
+    f = None
+    if log_path:
+        try:
+            f = open(log_path, "ab")  # noqa: SIM115
+        except Exception:
+            f = None
 
-    # Capture mpv stderr/stdout to a file so we can see why it exits (if it exits fast)
-    log_path = os.getenv("PARTYBOX_MPV_LOG", "/tmp/partybox-mpv.log")
     try:
-        f = open(log_path, "ab", buffering=0)  # noqa: SIM115
-    except Exception:
-        f = None
-
-    return subprocess.Popen(cmd, stdout=f or subprocess.DEVNULL, stderr=f or subprocess.DEVNULL)
+        return subprocess.Popen(cmd, stdout=f or subprocess.DEVNULL, stderr=f or subprocess.DEVNULL)
+    finally:
+        # mpv holds its own copy of the descriptor.
+        if f is not None:
+            f.close()
 
 
 def stop_mpv(proc: subprocess.Popen) -> None:
@@ -218,6 +443,63 @@ def stop_mpv(proc: subprocess.Popen) -> None:
         pass
 
 
+class _StateWatcher:
+    """
+    Long-polls /api/tv/state on its own connection while mpv runs, queueing
+    each change. One thread and connection serve every video: watch() points
+    it at a fresh queue, pause() parks it between videos.
+    """
+
+    def __init__(self) -> None:
+        self.channel = _ApiChannel()
+        self._cond = threading.Condition()
+        self._active = False
+        # Bumped by watch(); a long-poll answered after its session ended is dropped.
+        self._session = 0
+        self._etag = ""
+        self._events: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, etag: str) -> queue.Queue:
+        """Start watching from `etag`; changes go to the returned queue."""
+        with self._cond:
+            self._session += 1
+            self._etag = etag
+            self._events = queue.Queue()
+            self._active = True
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tv-state-watcher", daemon=True)
+                self._thread.start()
+            return self._events
+
+    def pause(self) -> None:
+        with self._cond:
+            self._active = False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._active)
+                session, etag = self._session, self._etag
+            try:
+                fresh, etag = get_state_longpoll(etag, HB_EVERY, channel=self.channel)
+            except Exception:
+                time.sleep(1.0)
+                continue
+            with self._cond:
+                if session != self._session or not self._active:
+                    continue
+                self._etag = etag
+                if fresh is not None:
+                    self._events.put((fresh, etag))
+
+
+def _watch_mpv(proc: subprocess.Popen, events: queue.Queue) -> None:
+    proc.wait()
+    events.put(None)
+
+
 def main() -> None:
     log(f"[tv_player] starting. API_BASE={API_BASE} MEDIA_DIR={MEDIA_DIR} MPV_BIN={MPV_BIN}")
 
@@ -234,37 +516,42 @@ def main() -> None:
     pending_seen: int = 0  # require >=2 before starting
 
     hb_last = 0.0
+    state: Dict[str, Any] = {}
+    state_etag = ""
+    hb_mode, hb_title, hb_youtube_id = "starting", "", ""
+    picked: Tuple[Optional[str], Optional[int], Optional[str], str] = (None, None, None, "starting")
+    watcher = _StateWatcher()
+    events: queue.Queue = queue.Queue()
 
     while True:
         try:
-            # If mpv is running, do NOT chase API "now" changes.
-            if proc is not None and proc.poll() is None:
-                now_ts = time.time()
-                if now_ts - hb_last >= HB_EVERY:
-                    hb_last = now_ts
-                    post_heartbeat(mode="playing", title=cur_title, youtube_id=cur_youtube_id or "")
-
-                # Stop mpv if paused/spotify flips on, or if "now" moved to another
-                # queue item (skip/remove/clear/promote effects).
+            # If mpv is running, do NOT chase API "now" changes. Wait on the
+            # watcher queue, which wakes us when mpv exits or the state changes;
+            # stop mpv if paused/spotify flips on, or if "now" moved to another
+            # queue item (skip/remove/clear/promote effects). The heartbeat
+            # deadline is checked on every pass, so a busy queue cannot starve it.
+            if proc is not None and proc.returncode is None:
+                if time.time() - hb_last >= HB_EVERY:
+                    hb_last = time.time()
+                    post_heartbeat("playing", cur_title, cur_youtube_id or "", timeout=PLAYBACK_REQUEST_TIMEOUT)
+                try:
+                    item = events.get(timeout=max(0.0, hb_last + HB_EVERY - time.time()))
+                except queue.Empty:
+                    continue
+                if item is None:
+                    # mpv exited; finalize below.
+                    continue
                 try:
-                    s2 = get_state()
-                    s2_media_mode = str(s2.get("media_mode") or "").lower()
-                    if not s2_media_mode:
-                        s2_media_mode = "spotify" if str(s2.get("av_mode") or "").lower() == "spotify" else "partybox"
-                    paused_or_spotify = bool(s2.get("paused", False)) or (s2_media_mode != "partybox")
-
-                    state_now = s2.get("now") or None
-                    state_qid: Optional[int] = None
-                    if state_now is not None and state_now.get("queue_id") is not None:
-                        try:
-                            state_qid = int(state_now.get("queue_id"))
-                        except Exception:
-                            state_qid = None
+                    s2, state_etag = item
+                    state = s2
+                    parsed = ParsedState(s2)
+                    picked = pick_item(parsed)
+                    paused_or_spotify = parsed.paused or parsed.media_mode != "partybox"
 
                     queue_item_replaced = bool(
                         cur_is_queue_item
                         and cur_queue_id is not None
-                        and state_qid != cur_queue_id
+                        and parsed.queue_id != cur_queue_id
                     )
 
                     if paused_or_spotify or queue_item_replaced:
@@ -276,12 +563,11 @@ def main() -> None:
                         stop_mpv(proc)
                 except Exception:
                     pass
-
-                time.sleep(0.5)
                 continue
 
             # If we had a proc and it ended, finalize it
             if proc is not None:
+                watcher.pause()
                 rc = proc.poll()
                 if rc is None:
                     stop_mpv(proc)
@@ -290,7 +576,8 @@ def main() -> None:
 
                 if complete_current_on_exit and cur_is_queue_item and cur_queue_id is not None:
                     try:
-                        mark_done(cur_queue_id)
+                        mark_done(cur_queue_id, cur_title, cur_youtube_id or "")
+                        hb_last = time.time()
                     except Exception as e:
                         log(f"[tv_player] warn: mark_done failed: {e}")
 
@@ -303,13 +590,24 @@ def main() -> None:
                 complete_current_on_exit = True
                 time.sleep(0.2)
 
-            state = get_state()
-            youtube_id, queue_id, title, mode = pick_item_from_state(state)
-
+            # While a new item is being debounced, re-check right away (the
+            # POLL_SECONDS sleep already spaced the two looks); otherwise let the
+            # server hold the request until something changes.
+            # The heartbeat reports what the previous look picked.
+            wait = 0.0 if pending_key else HB_EVERY
             now_ts = time.time()
             if now_ts - hb_last >= HB_EVERY:
                 hb_last = now_ts
-                post_heartbeat(mode=mode, title=title or "", youtube_id=youtube_id or "")
+                fresh, state_etag = tv_poll(hb_mode, hb_title, hb_youtube_id, state_etag, wait)
+            else:
+                fresh, state_etag = get_state_longpoll(state_etag, wait)
+            if fresh is not None:
+                state = fresh
+                picked = pick_item(ParsedState(state))
+            # A 304 means the state is byte-for-byte what we last parsed, so the
+            # previous pick still stands.
+            youtube_id, queue_id, title, mode = picked
+            hb_mode, hb_title, hb_youtube_id = mode, title or "", youtube_id or ""
 
             if mode != last_mode:
                 last_mode = mode
@@ -321,7 +619,6 @@ def main() -> None:
             if not youtube_id:
                 pending_key = None
                 pending_seen = 0
-                time.sleep(POLL_SECONDS)
                 continue
 
             key = (youtube_id, queue_id)
@@ -355,7 +652,8 @@ def main() -> None:
 
             if is_queue_item and queue_id is not None:
                 try:
-                    mark_playing(queue_id)
+                    mark_playing(queue_id, title or youtube_id, youtube_id)
+                    hb_last = time.time()
                 except Exception as e:
                     log(f"[tv_player] warn: mark_playing failed: {e}")
 
@@ -368,6 +666,8 @@ def main() -> None:
 
             log(f"[tv_player] playing: {cur_title} ({mode})")
             proc = start_mpv(target, use_ytdl=use_ytdl)
+            events = watcher.watch(state_etag)
+            threading.Thread(target=_watch_mpv, args=(proc, events), daemon=True).start()
 
             pending_key = None
             pending_seen = 0
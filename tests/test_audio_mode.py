@@ -24,12 +24,13 @@ class TestAudioModeManager(unittest.TestCase):
         def fake_set_setting(k: str, v: str):
             self.settings[k] = v
 
-        self.p_get = mock.patch("partybox.audio_mode.DB.get_setting", side_effect=fake_get_setting)
-        self.p_set = mock.patch("partybox.audio_mode.DB.set_setting", side_effect=fake_set_setting)
-        self.p_get.start()
-        self.p_set.start()
-        self.addCleanup(self.p_get.stop)
-        self.addCleanup(self.p_set.stop)
+        patcher = mock.patch.multiple(
+            "partybox.audio_mode.DB",
+            get_setting=mock.MagicMock(side_effect=fake_get_setting),
+            set_setting=mock.MagicMock(side_effect=fake_set_setting),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def _manager(self) -> AudioModeManager:
         mgr = AudioModeManager()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+GRAFANA = ROOT / "ops" / "grafana"
+
+# tools/ is a directory of scripts, not a package.
+_spec = importlib.util.spec_from_file_location("export_metrics_catalog", ROOT / "tools" / "export_metrics_catalog.py")
+emc = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(emc)
+
+
+def _families(catalog):
+    return {fam["name"]: fam for fam in catalog["metric_families"]}
+
+
+class TestExportMetricsCatalog(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.snapshot = (GRAFANA / "metrics_snapshot.prom").read_bytes()
+        cls.expected_json = (GRAFANA / "metrics_catalog.json").read_bytes()
+        cls.expected = json.loads(cls.expected_json)
+
+    def _parse_snapshot(self, chunk_size: int = 65536):
+        copy = io.BytesIO()
+        catalog = emc.parse_metrics(emc.tee_lines(io.BytesIO(self.snapshot), copy, chunk_size=chunk_size))
+        # The checked-in catalog was generated from the checked-in snapshot.
+        catalog["generated_at_epoch"] = self.expected["generated_at_epoch"]
+        catalog["source_url"] = self.expected["source_url"]
+        return catalog, copy.getvalue()
+
+    def test_snapshot_catalog_matches_checked_in_outputs(self) -> None:
+        catalog, copied = self._parse_snapshot()
+        self.assertEqual(copied, self.snapshot)
+        self.assertEqual(catalog, self.expected)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out_json = Path(tmp) / "catalog.json"
+            emc.write_catalog_json(catalog, out_json)
+            self.assertEqual(out_json.read_bytes(), self.expected_json)
+
+        markdown = emc.render_markdown(catalog, catalog["source_url"])
+        self.assertEqual(markdown, (GRAFANA / "metrics_catalog.md").read_text(encoding="utf-8"))
+
+    def test_tiny_chunks_give_the_same_catalog(self) -> None:
+        catalog, copied = self._parse_snapshot(chunk_size=7)
+        self.assertEqual(copied, self.snapshot)
+        self.assertEqual(catalog, self.expected)
+
+    def test_tee_lines_keeps_multibyte_characters_split_across_chunks(self) -> None:
+        raw = "a_total{who=\"Beyoncé\"} 1\r\nb 2".encode("utf-8")
+        copy = io.BytesIO()
+        lines = list(emc.tee_lines(io.BytesIO(raw), copy, chunk_size=1))
+        self.assertEqual(lines, ['a_total{who="Beyoncé"} 1', "b 2"])
+        self.assertEqual(copy.getvalue(), raw)
+
+    def test_edge_lines(self) -> None:
+        lines = [
+            "# HELP partybox_plays_total Plays | per mode",
+            "# TYPE partybox_plays_total counter",
+            'partybox_plays_total{mode="tv",title="Say \\"hi\\", ok"} 3',
+            "partybox_tab\t3",
+            '  partybox_indented{a="1"} 2',
+            "# TYPE partybox_bad ${bad}",
+            "# TYPE partybox_hist histogram",
+            'partybox_hist_bucket{le="+Inf"} 1',
+            'partybox_brace{a="x}y"} 4',
+            "9bad 1",
+        ]
+        families = _families(emc.parse_metrics(lines))
+
+        self.assertEqual(sorted(families), ["partybox_hist", "partybox_plays_total", "partybox_tab"])
+        plays = families["partybox_plays_total"]
+        self.assertEqual(plays["type"], "counter")
+        self.assertEqual(plays["help"], "Plays | per mode")
+        self.assertEqual(plays["label_values"], {"mode": ["tv"], "title": ['Say "hi", ok']})
+        self.assertEqual(families["partybox_tab"]["series_count"], 1)
+        self.assertEqual(families["partybox_hist"]["sample_metrics"], ["partybox_hist_bucket"])
+        self.assertIn("Plays \\| per mode", emc.render_markdown(emc.parse_metrics(lines), "x"))
+
+    def test_label_values_saturate_at_twenty(self) -> None:
+        lines = [f'partybox_many{{v="{i:02d}"}} 1' for i in range(30)]
+        fam = _families(emc.parse_metrics(lines))["partybox_many"]
+        self.assertEqual(fam["series_count"], 30)
+        self.assertEqual(len(fam["label_values"]["v"]), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
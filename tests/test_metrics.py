@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import unittest
+
+from prometheus_client import REGISTRY
+
+from partybox import metrics as METRICS
+
+
+def _sample(name: str, **labels: str):
+    return REGISTRY.get_sample_value(name, labels)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_set_mode_keeps_exactly_one_mode_active(self) -> None:
+        METRICS.set_mode("spotify")
+        METRICS.set_mode("tv")
+        METRICS.set_mode("tv")
+        active = [m for m in METRICS.MEDIA_MODES if _sample("partybox_mode", mode=m) == 1.0]
+        self.assertEqual(active, ["tv"])
+
+        METRICS.set_mode("not-a-mode")
+        active = [m for m in METRICS.MEDIA_MODES if _sample("partybox_mode", mode=m) == 1.0]
+        self.assertEqual(active, [])
+
+    def test_set_top_items_replaces_previous_rank_series(self) -> None:
+        METRICS.set_top_items("spotify", [{"track_id": "aaa", "title": "A", "artist": "X", "plays": 3}], limit=2)
+        self.assertEqual(_sample("partybox_top_item_plays", mode="spotify", rank="01", track_id="aaa"), 3.0)
+        self.assertEqual(_sample("partybox_top_item_plays", mode="spotify", rank="02", track_id="(none)"), 0.0)
+
+        METRICS.set_top_items("spotify", [{"track_id": "bbb", "title": "B", "artist": "Y", "plays": 5}], limit=2)
+        self.assertIsNone(_sample("partybox_top_item_plays", mode="spotify", rank="01", track_id="aaa"))
+        self.assertIsNone(_sample("partybox_top_item_meta", mode="spotify", rank="01", title="A", artist="X"))
+        self.assertEqual(_sample("partybox_top_item_plays", mode="spotify", rank="01", track_id="bbb"), 5.0)
+        self.assertEqual(_sample("partybox_top_item_info", mode="spotify", rank="01", track_id="bbb"), 1.0)
+        self.assertEqual(_sample("partybox_top_item_meta", mode="spotify", rank="01", title="B", artist="Y"), 1.0)
+
+    def test_label_cache_folds_values_past_cap(self) -> None:
+        cache = METRICS._LabelCache("test_label", str.lower, max_entries=4, max_values=2)
+        self.assertEqual(cache("A"), "a")
+        self.assertEqual(cache("B"), "b")
+        self.assertEqual(cache("C"), METRICS.OTHER_LABEL)
+        self.assertEqual(cache("a"), "a")
+        self.assertEqual(_sample("partybox_metrics_cardinality_capped_total", label="test_label"), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
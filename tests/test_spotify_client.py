@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+import unittest
+from unittest import mock
+
+from partybox import spotify_client
+from partybox.spotify_client import SpotifyClient
+
+
+class _FakeResponse:
+    def __init__(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+        self.status = status
+        self.reason = "OK"
+        self.headers = headers or {}
+        self.will_close = False
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body
+
+
+class _FakeConn:
+    def __init__(self, error: Exception | None = None, response: _FakeResponse | None = None) -> None:
+        self.error = error
+        self.response = response
+        self.requests = 0
+        self.closed = False
+
+    def request(self, method, path, body=None, headers=None) -> None:
+        self.requests += 1
+        if self.error is not None:
+            raise self.error
+
+    def getresponse(self) -> _FakeResponse:
+        return self.response
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestSpotifyClient(unittest.TestCase):
+    def _client(self, device_name: str = "PartyBox", device_id: str = "") -> SpotifyClient:
+        client = SpotifyClient("", "", "", device_name=device_name, device_id=device_id)
+        self.addCleanup(client.close)
+        return client
+
+    def _enabled_client(self) -> SpotifyClient:
+        client = SpotifyClient("id", "secret", "token", device_name="PartyBox", timeout_seconds=0.5)
+        self.addCleanup(client.close)
+        return client
+
+    def test_device_name_match_collapses_whitespace_and_case(self) -> None:
+        client = self._client(device_name="Party  Box")
+        self.assertTrue(client._device_matches("party box", ""))
+        self.assertTrue(client._device_matches(" PARTY\tBOX ", ""))
+        self.assertFalse(client._device_matches("partybox", ""))
+
+    def test_device_id_takes_precedence_over_name(self) -> None:
+        client = self._client(device_id="abc123")
+        self.assertTrue(client._device_matches("Kitchen", "abc123"))
+        self.assertFalse(client._device_matches("PartyBox", "other"))
+
+    def test_pick_images_orders_by_width(self) -> None:
+        item = {
+            "album": {
+                "images": [
+                    {"url": "large", "width": 640},
+                    {"url": "small", "width": 64},
+                    {"url": "medium", "width": 300},
+                ]
+            }
+        }
+        self.assertEqual(
+            SpotifyClient._pick_images(item),
+            {"small": "small", "medium": "medium", "large": "large"},
+        )
+        self.assertEqual(
+            SpotifyClient._pick_images({"album": {"images": []}}),
+            {"small": "", "medium": "", "large": ""},
+        )
+
+    def test_concurrent_forced_callers_share_one_fetch(self) -> None:
+        client = self._enabled_client()
+        calls = []
+        release = threading.Event()
+
+        def fetch(_self):
+            calls.append(1)
+            # Later fetches (woken by callers that arrived mid-flight) must not
+            # race the waiters reading the first result.
+            release.wait(5)
+            if len(calls) > 1:
+                time.sleep(5)
+            return {"ok": True, "state": "playing", "fetch": len(calls)}
+
+        results = []
+        with mock.patch.object(SpotifyClient, "_fetch_live_state", fetch):
+            threads = [threading.Thread(target=lambda: results.append(client.get_state(force=True))) for _ in range(5)]
+            for t in threads:
+                t.start()
+            time.sleep(0.2)
+            release.set()
+            for t in threads:
+                t.join(5)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual([r["fetch"] for r in results], [1] * 5)
+        self.assertTrue(all(r["cached"] is False for r in results))
+
+    def test_failed_fetch_releases_waiters(self) -> None:
+        client = self._enabled_client()
+
+        def fetch(_self):
+            raise RuntimeError("boom")
+
+        with mock.patch.object(SpotifyClient, "_fetch_live_state", fetch):
+            started = time.monotonic()
+            state = client.get_state(force=True)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(state["state"], "idle")
+        self.assertTrue(state["cached"])
+
+    def test_live_fetch_reports_cached_false(self) -> None:
+        client = self._enabled_client()
+
+        def fetch(_self):
+            return {"ok": True, "state": "playing"}
+
+        with mock.patch.object(SpotifyClient, "_fetch_live_state", fetch):
+            first = client.get_state()
+            second = client.get_state()
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["state"], "playing")
+
+    def test_not_modified_returns_cached_payload(self) -> None:
+        client = self._enabled_client()
+        client._auth_header = {"Authorization": "Bearer t"}
+        payload = {"is_playing": True}
+        sent_headers = []
+        responses = [(200, payload, "", {"etag": '"v1"'}), (304, None, "", {})]
+
+        def http_json(_self, method, url, headers=None, data=None):
+            sent_headers.append(dict(headers or {}))
+            return responses.pop(0)
+
+        with mock.patch.object(SpotifyClient, "_http_json", http_json), self.assertLogs("partybox.spotify_http") as logs:
+            self.assertEqual(client._conditional_get("/me/player")[:2], (200, payload))
+            status, again, err, _ = client._conditional_get("/me/player")
+
+        self.assertNotIn("If-None-Match", sent_headers[0])
+        self.assertEqual(sent_headers[1]["If-None-Match"], '"v1"')
+        self.assertEqual((status, err), (200, ""))
+        self.assertIs(again, payload)
+        self.assertIn("status=304", logs.output[-1])
+        self.assertIn("cached=true", logs.output[-1])
+
+    def test_stale_pooled_connection_is_retried_once(self) -> None:
+        client = self._enabled_client()
+        stale = _FakeConn(error=http.client.RemoteDisconnected("gone"))
+        fresh = _FakeConn(response=_FakeResponse(200, b'{"ok": true}'))
+        client._idle_conns["api.spotify.com"] = [stale]
+
+        with mock.patch.object(SpotifyClient, "_new_conn", return_value=fresh) as new_conn:
+            status, payload, err, _ = client._http_json("GET", "https://api.spotify.com/v1/me")
+
+        self.assertEqual((status, payload, err), (200, {"ok": True}, ""))
+        self.assertTrue(stale.closed)
+        self.assertEqual(new_conn.call_count, 1)
+        self.assertEqual(fresh.requests, 1)
+        self.assertEqual(client._idle_conns["api.spotify.com"], [fresh])
+
+    def test_fresh_connection_failure_is_not_retried(self) -> None:
+        client = self._enabled_client()
+        broken = _FakeConn(error=http.client.RemoteDisconnected("gone"))
+
+        with mock.patch.object(SpotifyClient, "_new_conn", return_value=broken) as new_conn:
+            status, payload, err, _ = client._http_json("GET", "https://api.spotify.com/v1/me")
+
+        self.assertEqual((status, payload), (0, None))
+        self.assertIn("gone", err)
+        self.assertEqual(new_conn.call_count, 1)
+        self.assertEqual(broken.requests, 1)
+
+    def test_idle_window_doubles_up_to_the_cap(self) -> None:
+        client = SpotifyClient("id", "secret", "token", device_name="PartyBox", cache_seconds=2)
+        self.addCleanup(client.close)
+        windows = []
+        with mock.patch.object(SpotifyClient, "_fetch_live_state", lambda _self: {"ok": True, "state": "paused"}):
+            for _ in range(8):
+                client._refresh(0.0)
+                windows.append(client._effective_cache_seconds)
+        self.assertEqual(windows, [2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 120.0, 120.0])
+
+        with mock.patch.object(SpotifyClient, "_fetch_live_state", lambda _self: {"ok": True, "state": "playing"}):
+            client._refresh(0.0)
+        self.assertEqual(client._effective_cache_seconds, 2.0)
+
+    def test_http_log_listener_runs_only_while_a_client_is_open(self) -> None:
+        # Other tests (or an app) may still hold clients, so count relative to them.
+        users = spotify_client._http_log_users
+        client = self._client()
+        self.assertEqual(spotify_client._http_log_users, users + 1)
+        self.assertIsNotNone(spotify_client._http_log_listener)
+
+        client.close()
+        client.close()
+        self.assertEqual(spotify_client._http_log_users, users)
+        if users == 0:
+            self.assertIsNone(spotify_client._http_log_listener)
+
+if __name__ == "__main__":
+    unittest.main()
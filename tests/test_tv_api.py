@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from partybox import db as DB
+from partybox.app import create_app
+from partybox.audio_mode import AudioModeManager
+
+
+class TestTvApi(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patchers = [
+            mock.patch.object(DB, "DB_PATH", os.path.join(tmp.name, "partybox.db")),
+            # Startup re-applies the media mode, which would shell out to systemctl.
+            mock.patch.object(AudioModeManager, "set_media_mode", return_value={"ok": True}),
+            mock.patch.dict(os.environ, {"PARTYBOX_START_PAUSED": "1", "PARTYBOX_AUTO_MEDIA_SCAN": "0"}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = create_app().test_client()
+
+    def _enqueue(self) -> int:
+        catalog_id = DB.add_catalog_item("Song", "dQw4w9WgXcQ")
+        return DB.enqueue(catalog_id)
+
+    def test_state_answers_immediately_with_etag(self) -> None:
+        started = time.monotonic()
+        resp = self.client.get("/api/tv/state")
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.headers.get("ETag"))
+        self.assertEqual(resp.json["mode"], "paused")
+
+    def test_matching_etag_without_wait_is_not_modified(self) -> None:
+        etag = self.client.get("/api/tv/state").headers["ETag"]
+        started = time.monotonic()
+        resp = self.client.get("/api/tv/state?wait=0", headers={"If-None-Match": etag})
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.headers["ETag"], etag)
+
+    def test_mutating_request_wakes_long_poll(self) -> None:
+        etag = self.client.get("/api/tv/state").headers["ETag"]
+        result = {}
+
+        def wait_for_change() -> None:
+            resp = self.client.get("/api/tv/state?wait=10", headers={"If-None-Match": etag})
+            result["status"] = resp.status_code
+            result["mode"] = resp.json["mode"]
+            result["done"] = time.monotonic()
+
+        waiter = threading.Thread(target=wait_for_change)
+        waiter.start()
+        time.sleep(0.3)
+        self.assertNotIn("status", result)
+
+        resumed = time.monotonic()
+        self.assertEqual(self.client.post("/api/admin/tv_resume?key=JBOX").status_code, 200)
+        waiter.join(5)
+
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["mode"], "empty")
+        # Woken by the bump, not by the 2s fallback re-check.
+        self.assertLess(result["done"] - resumed, 1.5)
+
+    def test_mark_playing_and_done_record_piggybacked_heartbeat(self) -> None:
+        qid = self._enqueue()
+
+        resp = self.client.post("/api/tv/mark_playing", json={"queue_id": qid})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNone(DB.get_setting("tv_heartbeat_json", None))
+
+        resp = self.client.post(
+            "/api/tv/mark_playing",
+            json={"queue_id": qid, "mode": "playing", "title": "Song", "youtube_id": "dQw4w9WgXcQ"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        heartbeat = json.loads(DB.get_setting("tv_heartbeat_json", "{}"))
+        self.assertEqual((heartbeat["mode"], heartbeat["title"]), ("playing", "Song"))
+
+        resp = self.client.post("/api/tv/mark_done", json={"queue_id": qid, "mode": "idle"})
+        self.assertEqual(resp.status_code, 200)
+        heartbeat = json.loads(DB.get_setting("tv_heartbeat_json", "{}"))
+        self.assertEqual((heartbeat["mode"], heartbeat["title"]), ("idle", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,25 +2,72 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import contextlib
+import gzip
+import io
 import json
+import os
 import re
+import tempfile
 import time
 import urllib.request
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-HELP_RE = re.compile(r"^# HELP ([a-zA-Z_:][a-zA-Z0-9_:]*) (.*)$")
-TYPE_RE = re.compile(r"^# TYPE ([a-zA-Z_:][a-zA-Z0-9_:]*) (\w+)$")
-SAMPLE_RE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([^}]*)\})?\s+(.+)$")
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+try:  # optional: C encoder for large catalogs
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+METRIC_NAME_RE = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+TYPE_NAME_RE = re.compile(r"\w+")
+# Only the head of a sample is needed: name, optional label blob, and proof
+# that a value follows.
+SAMPLE_HEAD_RE = re.compile(r"([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{([^}]*)\})?\s+.")
 LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:\\.|[^"\\])*)"')
 
 DERIVED_SUFFIXES = ("_bucket", "_sum", "_count", "_created")
-
-
-def fetch_metrics(url: str, timeout: float = 8.0) -> str:
-    with urllib.request.urlopen(url, timeout=timeout) as resp:
-        return (resp.read() or b"").decode("utf-8", errors="replace")
+# Pipes in help text would split markdown table cells.
+_MD_TABLE_ESCAPE = str.maketrans({"|": "\\|"})
+
+
+@contextlib.contextmanager
+def fetch_metrics(url: str, timeout: float = 8.0) -> Iterator[BinaryIO]:
+    """
+    Open the metrics endpoint and yield the (decompressed) body as a stream.
+    gzip is offered since exposition text compresses well; servers that
+    ignore it are read as-is.
+    """
+    req = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        if (resp.headers.get("Content-Encoding") or "").strip().lower() == "gzip":
+            with gzip.GzipFile(fileobj=resp) as body:
+                yield body
+        else:
+            yield resp
+
+
+def tee_lines(stream: BinaryIO, copy_to: BinaryIO, chunk_size: int = 65536) -> Iterator[str]:
+    """
+    Yield decoded lines from `stream` while copying the raw bytes to `copy_to`.
+    Reads in fixed-size chunks rather than line by line.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        copy_to.write(chunk)
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
 
 
 def family_name(metric_name: str, known_families: Dict[str, str]) -> str:
@@ -34,67 +81,122 @@ def family_name(metric_name: str, known_families: Dict[str, str]) -> str:
     return metric_name
 
 
-def parse_metrics(text: str) -> Dict[str, object]:
+def iter_labels(label_blob: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (name, raw value) pairs from a label blob such as `a="1",b="x,y"`.
+    Without backslashes a closing quote always ends the value, so plain find()
+    walks the blob; escaped values go through LABEL_RE.
+    """
+    if "\\" in label_blob:
+        for lm in LABEL_RE.finditer(label_blob):
+            yield lm.group(1), lm.group(2)
+        return
+
+    find = label_blob.find
+    pos = 0
+    while True:
+        eq = find('="', pos)
+        if eq == -1:
+            return
+        close = find('"', eq + 2)
+        if close == -1:
+            return
+        yield label_blob[pos:eq].strip(" ,"), label_blob[eq + 2 : close]
+        pos = close + 1
+
+
+def parse_metrics(lines: Iterable[str]) -> Dict[str, object]:
     helps: Dict[str, str] = {}
     types: Dict[str, str] = {}
 
     family_samples: Dict[str, set] = defaultdict(set)
     family_labels: Dict[str, set] = defaultdict(set)
     family_series_count: Dict[str, int] = defaultdict(int)
-    family_label_values: Dict[str, Dict[str, set]] = defaultdict(lambda: defaultdict(set))
-
-    lines = text.splitlines()
+    family_label_values: Dict[str, Dict[str, set]] = {}
+    # Labels whose value sample is already full, so later samples skip them.
+    family_saturated_labels: Dict[str, set] = defaultdict(set)
+
+    # metric name -> family. Resolution depends on the TYPE lines seen so far,
+    # so a new TYPE line resets it; the samples that follow it hit the cache.
+    family_cache: Dict[str, str] = {}
+    name_ok = METRIC_NAME_RE.fullmatch
+    type_ok = TYPE_NAME_RE.fullmatch
+    sample_head = SAMPLE_HEAD_RE.match
+
+    # The exposition format is line-anchored: comments dispatch on their
+    # prefix and samples only need their head matched.
     for line in lines:
-        m_help = HELP_RE.match(line)
-        if m_help:
-            helps[m_help.group(1)] = m_help.group(2)
+        if not line:
             continue
 
-        m_type = TYPE_RE.match(line)
-        if m_type:
-            types[m_type.group(1)] = m_type.group(2)
+        # Sample lines (the vast majority) get past this single comparison.
+        if line[0] == "#":
+            if line.startswith("# HELP "):
+                name, sep, help_text = line[7:].partition(" ")
+                if sep and name_ok(name):
+                    helps[name] = help_text
+            elif line.startswith("# TYPE "):
+                name, _, type_name = line[7:].partition(" ")
+                if name_ok(name) and type_ok(type_name):
+                    types[name] = type_name
+                    family_cache.clear()
             continue
 
-        if not line or line.startswith("#"):
+        m_sample = sample_head(line)
+        if m_sample is None:
             continue
+        metric_name, label_blob = m_sample.groups("")
 
-        m_sample = SAMPLE_RE.match(line)
-        if not m_sample:
-            continue
-
-        metric_name = m_sample.group(1)
-        label_blob = m_sample.group(3) or ""
-        family = family_name(metric_name, types)
+        family = family_cache.get(metric_name)
+        if family is None:
+            family = family_cache[metric_name] = family_name(metric_name, types)
 
         family_series_count[family] += 1
         family_samples[family].add(metric_name)
 
         if label_blob:
-            for lm in LABEL_RE.finditer(label_blob):
-                lk = lm.group(1)
-                lv = lm.group(2).replace('\\"', '"')
-                family_labels[family].add(lk)
-                if len(family_label_values[family][lk]) < 20:
-                    family_label_values[family][lk].add(lv)
-
-    all_families = sorted(set(helps) | set(types) | set(family_samples))
+            seen_labels = family_labels[family]
+            values_by_label = family_label_values.get(family)
+            if values_by_label is None:
+                values_by_label = family_label_values[family] = {}
+            saturated = family_saturated_labels[family]
+            for lk, lv in iter_labels(label_blob):
+                seen_labels.add(lk)
+                if lk in saturated:
+                    continue
+                values = values_by_label.get(lk)
+                if values is None:
+                    values = values_by_label[lk] = set()
+                values.add(lv.replace('\\"', '"') if "\\" in lv else lv)
+                if len(values) >= 20:
+                    saturated.add(lk)
+
+    # Key views union straight into one set; no per-dict copies.
+    all_families = sorted(helps.keys() | types.keys() | family_samples.keys())
+
+    types_get = types.get
+    helps_get = helps.get
+    labels_get = family_labels.get
+    label_values_get = family_label_values.get
+    count_get = family_series_count.get
+    samples_get = family_samples.get
+    empty: frozenset = frozenset()
 
     families: List[Dict[str, object]] = []
     for name in all_families:
-        labels = sorted(family_labels.get(name, set()))
-        label_values = {
-            lk: sorted(family_label_values[name].get(lk, set()))
-            for lk in labels
-        }
+        labels = sorted(labels_get(name, empty))
+        # Every label recorded for a family also got a value set on first sight.
+        values_by_label = label_values_get(name) or {}
+        label_values = {lk: sorted(values_by_label[lk]) for lk in labels}
         families.append(
             {
                 "name": name,
-                "type": types.get(name, ""),
-                "help": helps.get(name, ""),
-                "series_count": int(family_series_count.get(name, 0)),
+                "type": types_get(name, ""),
+                "help": helps_get(name, ""),
+                "series_count": int(count_get(name, 0)),
                 "labels": labels,
                 "label_values": label_values,
-                "sample_metrics": sorted(family_samples.get(name, set())),
+                "sample_metrics": sorted(samples_get(name, empty)),
             }
         )
 
@@ -105,40 +207,61 @@ def parse_metrics(text: str) -> Dict[str, object]:
     }
 
 
+def write_catalog_json(catalog: Dict[str, object], path: Path) -> None:
+    """Write the catalog as indented JSON straight to `path`."""
+    if orjson is not None:
+        with path.open("wb") as f:
+            f.write(orjson.dumps(catalog, option=orjson.OPT_INDENT_2))
+            f.write(b"\n")
+        return
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2, sort_keys=False)
+        f.write("\n")
+
+
 def render_markdown(catalog: Dict[str, object], source_url: str) -> str:
-    out: List[str] = []
-    out.append("# PartyBox Metrics Catalog")
-    out.append("")
-    out.append(f"Source: `{source_url}`")
-    out.append(f"Generated: `{catalog['generated_at_epoch']}` (unix epoch)")
-    out.append(f"Metric families: `{catalog['metric_family_count']}`")
-    out.append("")
-    out.append("| Metric | Type | Labels | Series | Help |")
-    out.append("|---|---|---|---:|---|")
+    """Render the catalog as markdown; every line, including the last, ends in a newline."""
+    buf = io.StringIO()
+    w = buf.write
+    w("# PartyBox Metrics Catalog\n\n")
+    w(f"Source: `{source_url}`\n")
+    w(f"Generated: `{catalog['generated_at_epoch']}` (unix epoch)\n")
+    w(f"Metric families: `{catalog['metric_family_count']}`\n\n")
+    w("| Metric | Type | Labels | Series | Help |\n")
+    w("|---|---|---|---:|---|\n")
     for fam in catalog.get("metric_families", []):
         if not isinstance(fam, dict):
             continue
-        labels = ", ".join(fam.get("labels", []))
-        help_text = str(fam.get("help", "")).replace("|", "\\|")
-        out.append(
-            f"| `{fam.get('name','')}` | `{fam.get('type','')}` | `{labels}` | {fam.get('series_count',0)} | {help_text} |"
-        )
-    out.append("")
-    out.append("## Label Value Samples")
-    out.append("")
+        w("| `")
+        w(str(fam.get("name", "")))
+        w("` | `")
+        w(str(fam.get("type", "")))
+        w("` | `")
+        w(", ".join(fam.get("labels", [])))
+        w("` | ")
+        w(str(fam.get("series_count", 0)))
+        w(" | ")
+        w(str(fam.get("help", "")).translate(_MD_TABLE_ESCAPE))
+        w(" |\n")
+    w("\n## Label Value Samples\n\n")
     for fam in catalog.get("metric_families", []):
         if not isinstance(fam, dict):
             continue
         label_values = fam.get("label_values", {})
         if not label_values:
             continue
-        out.append(f"### `{fam.get('name','')}`")
+        w("### `")
+        w(str(fam.get("name", "")))
+        w("`\n")
         for key in fam.get("labels", []):
-            vals = label_values.get(key, [])
-            out.append(f"- `{key}`: {', '.join(f'`{v}`' for v in vals)}")
-        out.append("")
+            w("- `")
+            w(key)
+            w("`: ")
+            w(", ".join(f"`{v}`" for v in label_values.get(key, [])))
+            w("\n")
+        w("\n")
 
-    return "\n".join(out)
+    return buf.getvalue()
 
 
 def main() -> int:
@@ -149,21 +272,31 @@ def main() -> int:
     parser.add_argument("--out-prom", default="ops/grafana/metrics_snapshot.prom", help="Output raw .prom snapshot path")
     args = parser.parse_args()
 
-    text = fetch_metrics(args.url)
-    catalog = parse_metrics(text)
-    catalog["source_url"] = args.url
-
     out_json = Path(args.out_json)
     out_md = Path(args.out_md)
     out_prom = Path(args.out_prom)
 
-    out_json.parent.mkdir(parents=True, exist_ok=True)
-    out_md.parent.mkdir(parents=True, exist_ok=True)
-    out_prom.parent.mkdir(parents=True, exist_ok=True)
+    for parent in {out_json.parent, out_md.parent, out_prom.parent}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    # Parse while streaming the raw snapshot to disk, so the exposition is
+    # never held in memory as a whole. The bytes land in a sibling temp file
+    # that only replaces the existing snapshot once the scrape succeeded.
+    prom_file = tempfile.NamedTemporaryFile(
+        dir=out_prom.parent, prefix=f".{out_prom.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with prom_file, fetch_metrics(args.url) as resp:
+            catalog = parse_metrics(tee_lines(resp, prom_file))
+        os.replace(prom_file.name, out_prom)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(prom_file.name)
+        raise
+    catalog["source_url"] = args.url
 
-    out_prom.write_text(text, encoding="utf-8")
-    out_json.write_text(json.dumps(catalog, indent=2, sort_keys=False) + "\n", encoding="utf-8")
-    out_md.write_text(render_markdown(catalog, args.url) + "\n", encoding="utf-8")
+    write_catalog_json(catalog, out_json)
+    out_md.write_text(render_markdown(catalog, args.url), encoding="utf-8")
 
     print(f"wrote {out_prom}")
     print(f"wrote {out_json}")
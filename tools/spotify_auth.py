@@ -10,17 +10,21 @@ import urllib.request
 AUTH_URL = "https://accounts.spotify.com/authorize"
 TOKEN_URL = "https://accounts.spotify.com/api/token"
 
+# The fixed query parameters, encoded once; only the per-user ones vary.
+_AUTHORIZE_PREFIX = f"{AUTH_URL}?{urllib.parse.urlencode({'response_type': 'code'})}&"
+_AUTHORIZE_SUFFIX = f"&{urllib.parse.urlencode({'show_dialog': 'true'})}"
+
 
 def build_authorize_url(client_id: str, redirect_uri: str, scope: str, state: str) -> str:
-    q = {
-        "response_type": "code",
-        "client_id": client_id,
-        "redirect_uri": redirect_uri,
-        "scope": scope,
-        "state": state,
-        "show_dialog": "true",
-    }
-    return f"{AUTH_URL}?{urllib.parse.urlencode(q)}"
+    q = urllib.parse.urlencode(
+        {
+            "client_id": client_id,
+            "redirect_uri": redirect_uri,
+            "scope": scope,
+            "state": state,
+        }
+    )
+    return f"{_AUTHORIZE_PREFIX}{q}{_AUTHORIZE_SUFFIX}"
 
 
 def exchange_code(client_id: str, client_secret: str, redirect_uri: str, code: str) -> dict: